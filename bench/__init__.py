@@ -0,0 +1 @@
+"""GBH benchmarks. Run from the repo root, e.g. `python -m bench.startup`."""
@@ -0,0 +1,144 @@
+"""
+Synthetic workloads for the benchmarks. Everything is seeded, so the same
+arguments always produce the same tree / burst / log.
+"""
+import os
+import time
+import shutil
+import random
+import threading
+
+# Size distributions: name -> (min_bytes, max_bytes). Sizes are log-uniform
+# inside the range, which is roughly what a Downloads folder looks like.
+SIZE_DISTRIBUTIONS = {
+    "tiny": (512, 16 * 1024),
+    "mixed": (4 * 1024, 4 * 1024 * 1024),
+    "large": (1024 * 1024, 32 * 1024 * 1024),
+}
+
+EXTENSIONS = [".jpg", ".png", ".pdf", ".txt", ".zip", ".mp3", ".mp4", ".py", ".csv", ".dmg"]
+
+
+def _size(rng, distribution):
+    lo, hi = SIZE_DISTRIBUTIONS[distribution]
+    return int(lo * (hi / lo) ** rng.random())
+
+
+def _write_payload(path, rng, size):
+    """Random header + zero padding: unique content without holding `size` bytes in memory."""
+    header = rng.randbytes(min(size, 4096))
+    with open(path, "wb") as f:
+        f.write(header)
+        remaining = size - len(header)
+        while remaining > 0:
+            chunk = min(remaining, 1024 * 1024)
+            f.write(bytes(chunk))
+            remaining -= chunk
+
+
+def make_tree(root, n_files, distribution="mixed", dup_ratio=0.1, depth=3, fanout=8, seed=0):
+    """
+    Writes `n_files` files under `root` spread over a `depth`-deep folder tree.
+    `dup_ratio` of them are byte-for-byte copies of an earlier file.
+    Returns (file_count, total_bytes).
+    """
+    rng = random.Random(seed)
+    dirs = [root]
+    frontier = [root]
+    for _ in range(depth):
+        frontier = [os.path.join(d, f"d{i}") for d in frontier for i in range(fanout)][:max(1, n_files // 4)]
+        dirs.extend(frontier)
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+
+    originals = []
+    total = 0
+    for i in range(n_files):
+        path = os.path.join(rng.choice(dirs), f"file_{i}{rng.choice(EXTENSIONS)}")
+        if originals and rng.random() < dup_ratio:
+            shutil.copyfile(rng.choice(originals), path)
+        else:
+            _write_payload(path, rng, _size(rng, distribution))
+            if len(originals) < 256:  # Keep a bounded pool of duplicate sources
+                originals.append(path)
+        total += os.path.getsize(path)
+    return n_files, total
+
+
+def download_burst(source_dir, n_files, distribution="tiny", interval=0.0, seed=0):
+    """
+    Simulates a burst of downloads landing in `source_dir`.
+    Files are written as `.part` and renamed when complete (like a browser).
+    Returns {filename: time the download finished}.
+    """
+    rng = random.Random(seed)
+    finished = {}
+    for i in range(n_files):
+        name = f"download_{i}{rng.choice(EXTENSIONS)}"
+        partial = os.path.join(source_dir, name + ".part")
+        _write_payload(partial, rng, _size(rng, distribution))
+        os.rename(partial, os.path.join(source_dir, name))
+        finished[name] = time.perf_counter()
+        if interval:
+            time.sleep(interval)
+    return finished
+
+
+def write_log_history(path, lines, start=None, step=0.5, error_every=50000):
+    """
+    Writes an existing log of `lines` stamped lines, `step` seconds apart and ending
+    now, with an error every `error_every` lines. Returns (first_epoch, last_epoch).
+    """
+    last = time.time() if start is None else start + lines * step
+    first = last - lines * step
+    with open(path, "w") as f:
+        for i in range(lines):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(first + i * step))
+            if i % error_every == error_every // 2:
+                f.write(f"{stamp} ERROR request {i} failed: Traceback follows\n")
+            else:
+                f.write(f"{stamp} INFO request {i} served in 12ms\n")
+    return first, last
+
+
+class LogWriter(threading.Thread):
+    """
+    Appends log lines to `path` at `rate` lines/sec. Every `error_every`-th line is
+    an error; the write time of each error line is kept in `error_times`.
+    """
+    def __init__(self, path, lines, rate=1000, error_every=50):
+        super().__init__(daemon=True)
+        self.path = path
+        self.lines = lines
+        self.rate = rate
+        self.error_every = error_every
+        self.error_times = []
+
+    def run(self):
+        delay = 1.0 / self.rate if self.rate else 0
+        with open(self.path, "a", buffering=1) as f:
+            for i in range(self.lines):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+                if i and i % self.error_every == 0:
+                    f.write(f"{stamp} ERROR request {i} failed: Traceback follows\n")
+                    self.error_times.append(time.perf_counter())
+                else:
+                    f.write(f"{stamp} INFO request {i} served in 12ms\n")
+                if delay:
+                    time.sleep(delay)
+
+
+class FakeWebSocket:
+    """Stands in for a dashboard browser tab: accepts send_json and records it."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.delay:
+            import asyncio
+            await asyncio.sleep(self.delay)
+        self.received += 1
@@ -0,0 +1,216 @@
+"""
+GBH benchmark runner (entry point: `python -m bench`).
+
+    python -m bench run [--scale small|medium|large] [--only NAME ...] [--param key=value] [--out FILE]
+    python -m bench compare BASELINE.json [CURRENT.json] [--threshold 10]
+    python -m bench list
+
+Each workload runs in its own fresh interpreter so peak RSS is per workload.
+`compare` without CURRENT runs the suite now (same scale/params as the baseline).
+"""
+import os
+import sys
+import json
+import time
+import queue
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from bench import workloads  # noqa: E402
+
+# Metric -> True if bigger is better
+COMPARED = {"throughput": True, "p95_ms": False, "peak_rss_mb": False}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _child(name, params, results):
+    """Runs one workload in a fresh process and reports back through `results`."""
+    random.seed(0)
+    try:
+        with tempfile.TemporaryDirectory(prefix="gbh-bench-") as workdir:
+            raw = workloads.WORKLOADS[name](params, workdir)
+    except workloads.Skip as e:
+        results.put({"skipped": str(e)})
+        return
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+        return
+
+    lat = raw["latencies_ms"]
+    results.put({
+        "ops": raw["ops"],
+        "unit": raw["unit"],
+        "seconds": round(raw["seconds"], 4),
+        "throughput": round(raw["ops"] / raw["seconds"], 2) if raw["seconds"] else None,
+        "p50_ms": percentile(lat, 50),
+        "p95_ms": percentile(lat, 95),
+        "p99_ms": percentile(lat, 99),
+        "max_ms": max(lat) if lat else None,
+        "samples": len(lat),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "extra": raw.get("extra", {}),
+    })
+
+
+def run_one(name, params, timeout=600):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, params, results))
+    proc.start()
+
+    deadline = time.time() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=0.5)
+        except queue.Empty:
+            if not proc.is_alive():
+                result = {"error": f"worker died (exit code {proc.exitcode})"}
+            elif time.time() > deadline:
+                proc.terminate()
+                result = {"error": f"timed out after {timeout}s"}
+    proc.join()
+    return result
+
+
+def run_suite(scale, only=None, overrides=None):
+    params = dict(workloads.SCALES[scale])
+    params.update(overrides or {})
+    names = only or list(workloads.WORKLOADS)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": scale,
+            "params": params,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+    for name in names:
+        print(f"⏱️  {name} ...", end=" ", flush=True)
+        result = run_one(name, params)
+        report["results"][name] = result
+        print(_summary(result))
+    return report
+
+
+def _summary(r):
+    if "skipped" in r:
+        return f"skipped ({r['skipped']})"
+    if "error" in r:
+        return f"❌ {r['error']}"
+    fmt = lambda v: "-" if v is None else f"{v:.1f}"
+    return (f"{fmt(r['throughput'])} {r['unit']}/s | p50 {fmt(r['p50_ms'])} ms, "
+            f"p95 {fmt(r['p95_ms'])} ms, p99 {fmt(r['p99_ms'])} ms | RSS {r['peak_rss_mb']} MB")
+
+
+def compare(baseline, current, threshold):
+    """Prints a side-by-side table. Returns the list of regressions beyond `threshold` %."""
+    regressions = []
+    print(f"\n{'workload':<24} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if not cur or "ops" not in base or "ops" not in cur:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            b, c = base.get(metric), cur.get(metric)
+            if not b or c is None:
+                continue
+            change = (c - b) / b * 100
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else ("✅" if worse < -threshold else "")
+            print(f"{name:<24} {metric:<12} {b:>12.2f} {c:>12.2f} {change:>+8.1f}% {flag}")
+            if worse > threshold:
+                regressions.append(f"{name} {metric} {change:+.1f}%")
+    return regressions
+
+
+def _parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs or []:
+        key, _, value = pair.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except ValueError:
+            overrides[key] = value
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="GBH benchmark suite")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run = sub.add_parser("run", help="Run the suite and save results as JSON")
+    run.add_argument("--scale", choices=list(workloads.SCALES), default="small")
+    run.add_argument("--only", nargs="+", choices=list(workloads.WORKLOADS), metavar="NAME")
+    run.add_argument("--param", action="append", metavar="KEY=VALUE", help="Override a scale parameter")
+    run.add_argument("--out", default="bench_results.json")
+
+    cmp_ = sub.add_parser("compare", help="Compare against a saved baseline")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current", nargs="?", help="Saved results (default: run the suite now)")
+    cmp_.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+
+    sub.add_parser("list", help="List workloads and scales")
+
+    args = parser.parse_args(argv)
+
+    if args.action == "list":
+        for name in workloads.WORKLOADS:
+            print(f"  {name}")
+        print(f"Scales: {', '.join(workloads.SCALES)}")
+        return 0
+
+    if args.action == "run":
+        report = run_suite(args.scale, args.only, _parse_overrides(args.param))
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results saved to {args.out}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        meta = baseline["meta"]
+        defaults = workloads.SCALES[meta["scale"]]
+        overrides = {k: v for k, v in meta["params"].items() if defaults.get(k) != v}
+        current = run_suite(meta["scale"], list(baseline["results"]), overrides)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0f}%:")
+        for r in regressions:
+            print(f"   {r}")
+        return 1
+    print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
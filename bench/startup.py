@@ -0,0 +1,100 @@
+"""
+Cold-start guard for the Reception Desk.
+
+Every subcommand is dispatched through main.COMMANDS, which imports its staff
+module lazily. This runs `main` + that module in a fresh interpreter under
+`-X importtime` and fails (exit 1) if a command pulls in a heavy dependency it
+doesn't need, or if its imports blow the time budget. tests/test_startup.py
+runs the same check for every command as part of the test suite.
+
+    python -m bench.startup [--budget-ms 150] [--runs 3]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import main  # noqa: E402 (needs BASE_DIR on the path)
+
+DEFAULT_BUDGET_MS = 150.0
+
+# Third-party packages that are slow to import, and the only commands allowed to load them
+HEAVY = {"psutil", "watchdog"}
+HEAVY_ALLOWED = {
+    "status": {"psutil"},
+    "sort": {"watchdog"},
+}
+
+def import_profile(code):
+    """Returns {module: self_us} for everything `code` imports in a fresh interpreter."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+def measure(command, baseline, runs):
+    """Best-of-N import cost (ms) of dispatching `command`, plus the modules it loaded."""
+    best, loaded = None, set()
+    for _ in range(runs):
+        modules = import_profile(f"import main; main.load_module({command!r})")
+        extra = {m: us for m, us in modules.items() if m not in baseline}
+        total_ms = sum(extra.values()) / 1000
+        best = total_ms if best is None else min(best, total_ms)
+        loaded = set(extra)
+    return best, loaded
+
+def check(command, baseline, runs=3, budget_ms=DEFAULT_BUDGET_MS):
+    """Returns (ms, heavy packages loaded, problems) for one command; no problems means it passes."""
+    ms, loaded = measure(command, baseline, runs)
+    heavy = {m.split(".")[0] for m in loaded} & HEAVY
+    problems = []
+    unexpected = heavy - HEAVY_ALLOWED.get(command, set())
+    if unexpected:
+        problems.append(f"{command}: imports {', '.join(sorted(unexpected))} but doesn't need it")
+    if ms > budget_ms:
+        problems.append(f"{command}: {ms:.1f} ms > budget {budget_ms:.0f} ms")
+    return ms, heavy, problems
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Guard gbh cold-start import cost per subcommand")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Max import time per command")
+    parser.add_argument("--runs", type=int, default=3, help="Best-of-N runs per command")
+    args = parser.parse_args(argv)
+
+    baseline = set(import_profile("pass"))
+    failures = []
+
+    print(f"{'command':<10} {'imports':>10}  heavy")
+    for name in main.COMMANDS:
+        try:
+            ms, heavy, problems = check(name, baseline, args.runs, args.budget_ms)
+        except RuntimeError as e:
+            failures.append(f"{name}: import failed ({e})")
+            continue
+
+        print(f"{name:<10} {ms:>8.1f}ms  {', '.join(sorted(heavy)) or '-'}")
+        failures.extend(problems)
+
+    if failures:
+        print("\n❌ Cold-start regressions:")
+        for f in failures:
+            print(f"   {f}")
+        return 1
+    print("\n✅ All commands within budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
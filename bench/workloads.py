@@ -0,0 +1,314 @@
+"""
+One benchmark per staff hot path. Each workload gets a scratch directory and a
+params dict, and returns raw numbers; bench/runner.py turns them into stats.
+
+A workload returns:
+    {"ops": int, "unit": str, "seconds": float, "latencies_ms": [...], "extra": {...}}
+"""
+import os
+import io
+import sys
+import time
+import asyncio
+import threading
+import contextlib
+
+from bench import generators
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+WORKLOADS = {}
+
+# Problem sizes per scale. Override single values with --param key=value.
+SCALES = {
+    "small": {
+        "dupe_files": 2000, "sweep_files": 5000, "pack_files": 1000, "burst_files": 200,
+        "history_lines": 200000, "log_lines": 2000, "log_rate": 2000, "ws_clients": 50, "ws_rounds": 50,
+        "distribution": "tiny", "dup_ratio": 0.2, "runs": 3,
+    },
+    "medium": {
+        "dupe_files": 20000, "sweep_files": 50000, "pack_files": 5000, "burst_files": 1000,
+        "history_lines": 2000000, "log_lines": 20000, "log_rate": 5000, "ws_clients": 200, "ws_rounds": 200,
+        "distribution": "tiny", "dup_ratio": 0.2, "runs": 3,
+    },
+    "large": {
+        "dupe_files": 200000, "sweep_files": 200000, "pack_files": 20000, "burst_files": 5000,
+        "history_lines": 20000000, "log_lines": 200000, "log_rate": 20000, "ws_clients": 1000, "ws_rounds": 500,
+        "distribution": "mixed", "dup_ratio": 0.2, "runs": 1,
+    },
+}
+
+
+class Skip(Exception):
+    """Raised when a workload can't run here (e.g. a missing optional dependency)."""
+
+
+def workload(name):
+    def register(func):
+        WORKLOADS[name] = func
+        return func
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """The staff narrate everything with print(); keep it out of the results."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _import(module):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise Skip(f"{module}: {e}")
+
+
+# --- ZERO: DUPLICATE HUNT ---
+@workload("zero.find_duplicates")
+def bench_find_duplicates(params, workdir):
+    zero = _import("staff.zero")
+    tree = os.path.join(workdir, "tree")
+    files, total = generators.make_tree(
+        tree, params["dupe_files"], params["distribution"], params["dup_ratio"]
+    )
+
+    latencies, groups = [], 0
+    for _ in range(params["runs"]):
+        start = time.perf_counter()
+        with quiet():
+            groups = len(zero.Zero().scan_duplicates(tree))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "ops": files * params["runs"], "unit": "files",
+        "seconds": sum(latencies) / 1000, "latencies_ms": latencies,
+        "extra": {"files": files, "bytes": total, "duplicate_groups": groups},
+    }
+
+
+# --- ZERO: SCREENSHOT SWEEP ---
+@workload("zero.clean_screenshots")
+def bench_clean_screenshots(params, workdir):
+    zero = _import("staff.zero")
+    desktop = os.path.join(workdir, "Desktop")
+    os.makedirs(desktop)
+    zero.TRASH_DIR = os.path.join(workdir, "Trash")
+    zero.SWEEP_INDEX_FILE = os.path.join(workdir, "sweep_index.json")
+
+    # A cluttered Desktop: mostly other files, 1% old screenshots
+    old = time.time() - 7 * 86400
+    shots = params["sweep_files"] // 100
+    for i in range(params["sweep_files"]):
+        name = f"Screenshot {i}.png" if i < shots else f"note_{i}.txt"
+        path = os.path.join(desktop, name)
+        open(path, "w").close()
+        if i < shots:
+            os.utime(path, (old, old))
+    rules = [{"name": "screenshots", "dir": desktop, "glob": "*Screenshot*.png", "older_than_days": 1}]
+
+    with quiet():
+        start = time.perf_counter()
+        moved = len(zero.Zero().clean_screenshots(rules=rules))
+        first = (time.perf_counter() - start) * 1000
+        zero.Zero().clean_screenshots(rules=rules)  # Re-scan after our own moves
+
+        idle = []
+        for _ in range(max(10, params["runs"])):
+            start = time.perf_counter()
+            zero.Zero().clean_screenshots(rules=rules)
+            idle.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "ops": len(idle), "unit": "idle sweeps", "seconds": sum(idle) / 1000, "latencies_ms": idle,
+        "extra": {"files": params["sweep_files"], "moved": moved, "first_sweep_ms": round(first, 2)},
+    }
+
+
+# --- AGATHA: PACKING ---
+@workload("agatha.pack_project")
+def bench_pack_project(params, workdir):
+    agatha = _import("staff.agatha")
+    project = os.path.join(workdir, "project")
+    files, total = generators.make_tree(project, params["pack_files"], params["distribution"], 0.0)
+    # A little junk that must be skipped
+    generators.make_tree(os.path.join(project, "node_modules"), params["pack_files"] // 4, "tiny", 0.0, seed=1)
+
+    latencies, archive_bytes = [], 0
+    for i in range(params["runs"]):
+        out = os.path.join(workdir, f"out{i}")
+        start = time.perf_counter()
+        with quiet():
+            zip_path = agatha.Agatha().pack_project(project, dest_dir=out)
+        latencies.append((time.perf_counter() - start) * 1000)
+        archive_bytes = os.path.getsize(zip_path)
+
+    return {
+        "ops": total * params["runs"] / (1024 * 1024), "unit": "MB",
+        "seconds": sum(latencies) / 1000, "latencies_ms": latencies,
+        "extra": {"files": files, "bytes": total, "archive_bytes": archive_bytes},
+    }
+
+
+# --- SERGE: DOWNLOAD BURST ---
+@workload("serge.SmartSorter")
+def bench_smart_sorter(params, workdir):
+    serge = _import("staff.serge")
+    source = os.path.join(workdir, "Downloads")
+    os.makedirs(source)
+
+    serge.SOURCE_DIR = source
+    serge.PROJECTS_DIR = os.path.join(workdir, "Projects")
+    serge.SETTLE_DELAY = 0  # Measure the sorter, not its deliberate pause
+    serge.send_notification = lambda title, message: None
+
+    moved = {}
+
+    class TimedSorter(serge.SmartSorter):
+        def sort_file(self, file_path, settle=0):
+            existed = os.path.exists(file_path)
+            super().sort_file(file_path, settle)
+            if existed and not os.path.exists(file_path):
+                moved[os.path.basename(file_path)] = time.perf_counter()
+
+    observer = serge.Observer()
+    observer.schedule(TimedSorter(), source, recursive=False)
+    observer.start()
+    try:
+        with quiet():
+            start = time.perf_counter()
+            finished = generators.download_burst(source, params["burst_files"])
+            deadline = time.time() + 30
+            while any(name not in moved for name in finished) and time.time() < deadline:
+                time.sleep(0.01)
+            seconds = time.perf_counter() - start
+    finally:
+        observer.stop()
+        observer.join()
+
+    latencies = [(moved[name] - t) * 1000 for name, t in finished.items() if name in moved]
+    return {
+        "ops": len(latencies), "unit": "files", "seconds": seconds, "latencies_ms": latencies,
+        "extra": {"downloaded": len(finished), "sorted": len(latencies)},
+    }
+
+
+# --- DIMITRI: LOG ALERTS ---
+@workload("dimitri.watch_log")
+def bench_watch_log(params, workdir):
+    dimitri = _import("staff.dimitri")
+    log_path = os.path.join(workdir, "app.log")
+    open(log_path, "w").close()
+
+    alerts = []
+
+    class TimedDimitri(dimitri.Dimitri):
+        def _notify(self, title, message):
+            alerts.append(time.perf_counter())
+
+    guard = TimedDimitri()
+    guard.index = dimitri.LogIndex(os.path.join(workdir, "index.json"))
+    watcher = threading.Thread(target=guard.watch_log, args=(log_path,), daemon=True)
+    watcher.start()
+    time.sleep(0.2)  # Let Dimitri open the file and seek to the end
+
+    writer = generators.LogWriter(log_path, params["log_lines"], rate=params["log_rate"])
+    start = time.perf_counter()
+    writer.start()
+    writer.join()
+    seconds = time.perf_counter() - start
+
+    deadline = time.time() + 5
+    while len(alerts) < len(writer.error_times) and time.time() < deadline:
+        time.sleep(0.05)
+    guard.stop()
+
+    latencies = [(a - w) * 1000 for w, a in zip(writer.error_times, alerts)]
+    return {
+        "ops": params["log_lines"], "unit": "lines", "seconds": seconds, "latencies_ms": latencies,
+        "extra": {"errors_written": len(writer.error_times), "alerts": len(alerts)},
+    }
+
+
+# --- DIMITRI: LOG SEARCH ---
+@workload("dimitri.search_log")
+def bench_search_log(params, workdir):
+    dimitri = _import("staff.dimitri")
+    log_path = os.path.join(workdir, "history.log")
+    _, last = generators.write_log_history(log_path, params["history_lines"])
+    size = os.path.getsize(log_path)
+    # The last hour of the log: the index should skip straight to it
+    since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last - 3600)).encode()
+
+    guard = dimitri.Dimitri()
+    guard.index = dimitri.LogIndex(os.path.join(workdir, "index.json"))
+
+    full, ranged, matches = [], [], 0
+    for _ in range(params["runs"]):
+        start = time.perf_counter()
+        with quiet():
+            matches = len(guard.search_log(log_path)[0])
+        full.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        with quiet():
+            guard.search_log(log_path, since=since)
+        ranged.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "ops": size * params["runs"] / (1024 * 1024), "unit": "MB",
+        "seconds": sum(full) / 1000, "latencies_ms": full,
+        "extra": {"bytes": size, "matches": matches,
+                  "last_hour_ms": round(sorted(ranged)[len(ranged) // 2], 2)},
+    }
+
+
+# --- SERVER: VITALS BROADCAST ---
+@workload("server.broadcast_loop")
+def bench_broadcast(params, workdir):
+    os.chdir(BASE_DIR)  # server.py loads templates/ relative to the cwd
+    server = _import("server")
+    from bench.generators import FakeWebSocket
+
+    async def run():
+        manager = server.ConnectionManager()
+        clients = [FakeWebSocket() for _ in range(params["ws_clients"])]
+        for ws in clients:
+            await manager.connect(ws)
+
+        latencies = []
+        for _ in range(params["ws_rounds"]):
+            start = time.perf_counter()
+            data = server.get_system_vitals()
+            await manager.broadcast(data)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies, sum(ws.received for ws in clients)
+
+    latencies, delivered = asyncio.run(run())
+    return {
+        "ops": delivered, "unit": "messages", "seconds": sum(latencies) / 1000, "latencies_ms": latencies,
+        "extra": {"clients": params["ws_clients"], "rounds": params["ws_rounds"]},
+    }
+
+
+# --- MAIN.PY: COLD START ---
+@workload("main.startup")
+def bench_startup(params, workdir):
+    from bench import startup
+    import main
+
+    baseline = set(startup.import_profile("pass"))
+    latencies = []
+    for name in main.COMMANDS:
+        try:
+            ms, _ = startup.measure(name, baseline, runs=1)
+        except RuntimeError as e:
+            raise Skip(str(e))
+        latencies.append(ms)
+
+    return {
+        "ops": len(latencies), "unit": "commands", "seconds": sum(latencies) / 1000,
+        "latencies_ms": latencies, "extra": dict(zip(main.COMMANDS, [round(l, 2) for l in latencies])),
+    }
@@ -11,4 +11,26 @@ PERMANENT_PORTS = [3000, 8000, 5432, 8080]
 PERMANENT_LOGS = [
     # os.path.expanduser("~/Documents/Projects/my_app/debug.log"),
     # os.path.expanduser("~/Library/Logs/nginx/error.log"),
-]
\ No newline at end of file
+]
+
+# --- ZERO'S SWEEP RULES ---
+
+# Which files Zero moves to the Trash (`gbh clean`, the nightly sweep).
+# Each rule names a folder, a `glob` (or a `regex`) for file names, and one or
+# more policies. A file goes if any policy picks it:
+#   older_than_days: created more than N days ago
+#   keep_newest:     keep only the N newest matches
+#   max_total_mb:    trash the oldest matches until the rest fit in N MB
+# Preview with `gbh clean --dry-run`.
+SWEEP_RULES = [
+    {"name": "screenshots", "dir": "~/Desktop", "glob": "*Screenshot*.png", "older_than_days": 1},
+    # {"name": "recordings", "dir": "~/Desktop", "regex": r"^Screen Recording .*\.mov$", "older_than_days": 7},
+    # {"name": "installers", "dir": "~/Downloads", "glob": "*.dmg", "keep_newest": 3},
+]
+
+# --- SERGE'S ROUNDS ---
+
+# Let the dashboard's scheduler sort ~/Downloads every hour, including files
+# that were there before Serge was hired (code files go to ~/Documents/Projects).
+# Off by default: only `gbh sort` moves anything unless you opt in.
+SERGE_CATCH_UP = False
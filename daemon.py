@@ -0,0 +1,317 @@
+"""
+The Lobby: one long-running process that hosts the whole staff.
+
+`gbh` normally pays for a fresh interpreter plus the psutil/watchdog imports on
+every call. When the Lobby is running, main.py forwards commands over a Unix
+socket instead, and background jobs (`--bg`) become threads in here rather than
+whole new Python processes.
+
+Protocol: one JSON object per line in each direction.
+    -> {"cmd": "status", "args": [...]}
+    <- {"ok": true, "output": "...", ...}
+"""
+import os
+import io
+import sys
+import json
+import time
+import socket
+import itertools
+import threading
+import subprocess
+import socketserver
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), f"gbh-{os.getuid()}.sock")
+DAEMON_LOG = os.path.join(BASE_DIR, "gbh_daemon.log")
+
+# Commands the Lobby can answer (everything else runs locally in main.py)
+SERVED_COMMANDS = {"status", "wait", "watch", "patrol", "sort", "pack", "backup", "clean"}
+
+
+# --- CLIENT SIDE (stdlib only, imported by main.py) ---
+def request(payload, timeout=None):
+    """Sends one request to the Lobby. Returns the reply dict, or None if nobody is home."""
+    if not os.path.exists(SOCKET_PATH):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(SOCKET_PATH)
+            sock.sendall((json.dumps(payload) + "\n").encode())
+            with sock.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def is_running():
+    return request({"cmd": "ping"}, timeout=1) is not None
+
+
+def spawn():
+    """Starts the Lobby as a detached process."""
+    log = open(DAEMON_LOG, "a")
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__)],
+        stdout=log,
+        stderr=log,
+        start_new_session=True
+    )
+    # Wait (briefly) for the socket to come up
+    for _ in range(50):
+        if is_running():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+# --- SERVER SIDE ---
+class _ThreadStdout(io.TextIOBase):
+    """
+    Staff talk with print(). Each request thread gets its own buffer so replies
+    don't pick up chatter from background watchers; everything else goes to the log.
+    """
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def capture(self):
+        self.local.buffer = io.StringIO()
+
+    def release(self):
+        buffer = getattr(self.local, "buffer", None)
+        self.local.buffer = None
+        return buffer.getvalue() if buffer else ""
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(text)
+        written = self.fallback.write(text)
+        self.fallback.flush()
+        return written
+
+    def flush(self):
+        self.fallback.flush()
+
+
+class _LobbyServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class Lobby:
+    def __init__(self):
+        # Measure what every cold `gbh` call would otherwise pay for
+        start = time.perf_counter()
+        from staff import serge, zero, gustave, dimitri, agatha
+        self.import_ms = (time.perf_counter() - start) * 1000
+        self.serge, self.zero, self.gustave, self.dimitri, self.agatha = serge, zero, gustave, dimitri, agatha
+        import jobs  # Progress/Cancelled give pack tasks a stop button
+        self.jobs = jobs
+
+        self.started = time.time()
+        self.tasks = {}
+        self.task_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.timings = {}  # cmd -> [count, total_ms]
+        self.cold_start_ms = None
+
+        self.stdout = _ThreadStdout(sys.stdout)
+        sys.stdout = self.stdout
+
+    # --- TASKS ---
+    def _start_task(self, label, target, stop):
+        task_id = next(self.task_ids)
+        task = {"id": task_id, "command": label, "started": time.time(), "stop": stop}
+
+        def run():
+            try:
+                target()
+            except self.jobs.Cancelled:
+                print(f"[GBH] Task {task_id} ({label}) stopped.")
+            except Exception as e:
+                print(f"[GBH] Task {task_id} ({label}) failed: {e}")
+            finally:
+                with self.lock:
+                    self.tasks.pop(task_id, None)
+
+        task["thread"] = threading.Thread(target=run, name=f"gbh-task-{task_id}", daemon=True)
+        with self.lock:
+            self.tasks[task_id] = task
+        task["thread"].start()
+        return task_id
+
+    def _task_for(self, command, args):
+        """Returns (label, target, stop) for a background job. `stop` is None if it can't be stopped."""
+        if command in ("wait", "watch", "patrol"):
+            guard = self.dimitri.Dimitri()
+            if command == "wait":
+                target = lambda: guard.wait_for_port(int(args[0]))
+            elif command == "watch":
+                since = args[1] if len(args) > 1 else None
+                if since and since != "last":
+                    self.dimitri.parse_when(since)  # Reject a bad --since now, not inside the task
+                target = lambda: guard.watch_log(args[0], since=since)
+            else:
+                import config
+                target = lambda: guard.start_patrol(config.PERMANENT_PORTS, config.PERMANENT_LOGS)
+            return " ".join([command] + args), target, guard.stop
+
+        if command == "sort":
+            stop_event = threading.Event()
+            return "sort", lambda: self.serge.start_watch(stop_event), stop_event.set
+
+        if command == "pack":
+            baker = self.agatha.Agatha()
+            progress = self.jobs.Progress()  # Cancelling it stops the zip between files
+            target = lambda: baker.pack_project(args[0], progress=progress)
+            return " ".join(["pack"] + args), target, progress.cancel_event.set
+
+        if command in ("status", "backup", "clean"):
+            # Short one-shots: run off the caller's terminal, output goes to the Lobby log
+            return " ".join([command] + args), lambda: self._run_foreground(command, args), None
+
+        raise ValueError(f"'{command}' can't run in the background.")
+
+    def list_tasks(self):
+        with self.lock:
+            return [
+                {"id": t["id"], "command": t["command"], "uptime": round(time.time() - t["started"])}
+                for t in self.tasks.values()
+            ]
+
+    def stop_tasks(self, task_id=None):
+        """Returns (ids stopped, ids that can't be stopped and will run to the end)."""
+        with self.lock:
+            targets = list(self.tasks.values()) if task_id is None else [self.tasks[task_id]] if task_id in self.tasks else []
+        stopped, unstoppable = [], []
+        for task in targets:
+            if task["stop"] is None:
+                unstoppable.append(task["id"])
+            else:
+                task["stop"]()
+                stopped.append(task["id"])
+        return stopped, unstoppable
+
+    # --- FOREGROUND COMMANDS ---
+    def _run_foreground(self, command, args):
+        if command == "status":
+            g = self.gustave.Gustave()
+            if "--notify" in args:
+                g.notify()
+            else:
+                g.report()
+        elif command == "backup":
+            self.agatha.Agatha().backup_config()
+        elif command == "clean":
+            self.zero.Zero().clean_screenshots(dry_run="--dry-run" in args)
+        else:
+            raise ValueError(f"'{command}' must run in the background (use --bg).")
+
+    def _measure_cold_start(self):
+        """Times a fresh interpreter importing the staff, i.e. the 'before' number."""
+        if self.cold_start_ms is None:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", "from staff import serge, zero, gustave, dimitri, agatha"],
+                cwd=BASE_DIR, capture_output=True
+            )
+            self.cold_start_ms = (time.perf_counter() - start) * 1000
+        return self.cold_start_ms
+
+    def stats(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started),
+            "import_ms": round(self.import_ms, 1),
+            "cold_start_ms": round(self._measure_cold_start(), 1),
+            "commands": {
+                cmd: {"count": count, "avg_ms": round(total / count, 2)}
+                for cmd, (count, total) in self.timings.items()
+            },
+            "tasks": len(self.tasks),
+        }
+
+    # --- DISPATCH ---
+    def handle(self, payload):
+        cmd = payload.get("cmd")
+        args = payload.get("args", [])
+
+        if cmd == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if cmd == "tasks":
+            return {"ok": True, "tasks": self.list_tasks()}
+        if cmd == "stop":
+            stopped, unstoppable = self.stop_tasks(payload.get("id"))
+            return {"ok": True, "stopped": stopped, "unstoppable": unstoppable}
+        if cmd == "stats":
+            return {"ok": True, "stats": self.stats()}
+        if cmd == "shutdown":
+            self.stop_tasks()
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True}
+
+        if cmd not in SERVED_COMMANDS:
+            return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+        start = time.perf_counter()
+        try:
+            if payload.get("bg"):
+                label, target, stop = self._task_for(cmd, args)
+                reply = {"ok": True, "task": self._start_task(label, target, stop)}
+            else:
+                self.stdout.capture()
+                try:
+                    self._run_foreground(cmd, args)
+                finally:
+                    output = self.stdout.release()
+                reply = {"ok": True, "output": output}
+        except (ValueError, IndexError) as e:
+            reply = {"ok": False, "error": str(e)}
+
+        elapsed = (time.perf_counter() - start) * 1000
+        with self.lock:
+            count, total = self.timings.get(cmd, (0, 0.0))
+            self.timings[cmd] = (count + 1, total + elapsed)
+        return reply
+
+    def serve(self):
+        lobby = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+                try:
+                    reply = lobby.handle(json.loads(line))
+                except ValueError:
+                    reply = {"ok": False, "error": "Bad request"}
+                self.wfile.write((json.dumps(reply) + "\n").encode())
+
+        if os.path.exists(SOCKET_PATH):
+            if is_running():
+                print("🏨 The Lobby is already open.")
+                return
+            os.remove(SOCKET_PATH)  # Stale socket from a crash
+
+        with _LobbyServer(SOCKET_PATH, Handler) as server:
+            self.server = server
+            os.chmod(SOCKET_PATH, 0o600)
+            print(f"🏨 The Lobby is open on {SOCKET_PATH} (staff loaded in {self.import_ms:.0f} ms)")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                self.stop_tasks()
+            finally:
+                if os.path.exists(SOCKET_PATH):
+                    os.remove(SOCKET_PATH)
+        print("🏨 The Lobby is closed.")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, BASE_DIR)
+    Lobby().serve()
@@ -0,0 +1,262 @@
+"""
+The Back Office: long-running staff jobs started from the dashboard.
+
+Duplicate hunts and project packing run on a small worker pool, off the
+server's event loop. Each job gets a Progress object that the staff update as
+they go (files crawled, bytes hashed/compressed); the server streams those
+snapshots over the vitals WebSocket. Cancelling a job makes its next progress
+update raise Cancelled, so it stops between files.
+"""
+import os
+import time
+import itertools
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import telemetry
+
+MAX_WORKERS = 2     # Jobs running at once; the rest wait in the queue
+MAX_FINISHED = 50   # Finished jobs kept around for /api/jobs
+
+JOBS = telemetry.counter("gbh_jobs_total", "Dashboard jobs finished, by kind and final state")
+
+KINDS = {}
+
+
+def job_kind(name, prepare=None):
+    """
+    Registers func(params, progress) -> JSON-able result as a job kind.
+    `prepare(params)` runs at submit time: it normalizes the params and raises
+    ValueError for bad ones, so mistakes are reported before anything is queued.
+    """
+    def register(func):
+        KINDS[name] = (func, prepare)
+        return func
+    return register
+
+
+class Cancelled(BaseException):
+    """
+    Raised inside a cancelled job. A BaseException (like KeyboardInterrupt) so
+    the staff's `except Exception` handlers don't swallow it.
+    """
+
+
+# --- PROGRESS ---
+class Progress:
+    """
+    Counters a running job updates, plus the current phase. A phase started with
+    a `total` (in units of one counter) gets a percentage and an ETA.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.counts = {}
+        self.phase = None
+        self.total = None
+        self.key = None
+        self.base = 0
+        self.phase_started = None
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    def add(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                self.counts[key] = self.counts.get(key, 0) + value
+        self.check()
+
+    def start_phase(self, name, total=None, key=None):
+        with self.lock:
+            self.phase = name
+            self.total = total
+            self.key = key
+            self.base = self.counts.get(key, 0) if key else 0
+            self.phase_started = time.monotonic()
+        self.check()
+
+    def snapshot(self):
+        with self.lock:
+            data = {"phase": self.phase, **self.counts}
+            if self.total and self.key:
+                done = self.counts.get(self.key, 0) - self.base
+                elapsed = time.monotonic() - self.phase_started
+                data["total"] = self.total
+                data["percent"] = round(min(100.0, done * 100 / self.total), 1)
+                data["eta_seconds"] = round(elapsed * max(0, self.total - done) / done, 1) if done else None
+        return data
+
+
+# --- JOBS ---
+class Job:
+    def __init__(self, job_id, kind, params):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.state = "queued"  # queued -> running -> done | failed | cancelled
+        self.progress = Progress()
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+
+    @property
+    def active(self):
+        return self.state in ("queued", "running")
+
+    def snapshot(self, result=False):
+        fmt = lambda ts: datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else None
+        end = self.finished or time.time()
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "progress": self.progress.snapshot(),
+            "created": fmt(self.created),
+            "started": fmt(self.started),
+            "finished": fmt(self.finished),
+            "elapsed_seconds": round(end - self.started, 1) if self.started else None,
+            "error": self.error,
+        }
+        if result:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gbh-backoffice")
+
+    def submit(self, kind, params=None):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind '{kind}' (choose from: {', '.join(sorted(KINDS))})")
+        _, prepare = KINDS[kind]
+        params = dict(params or {})
+        params = prepare(params) if prepare else params
+        job = Job(next(self.ids), kind, params)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._prune()
+        job.future = self.pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        if job.progress.cancel_event.is_set():
+            # Cancelled after a worker picked it up, before it started
+            job.state = "cancelled"
+            job.finished = time.time()
+            JOBS.inc(kind=job.kind, state=job.state)
+            return
+        job.state = "running"
+        job.started = time.time()
+        try:
+            with telemetry.span(f"jobs.{job.kind}"):
+                job.result = KINDS[job.kind][0](job.params, job.progress)
+            job.state = "done"
+        except Cancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.state = "failed"
+        finally:
+            job.finished = time.time()
+            JOBS.inc(kind=job.kind, state=job.state)
+
+    def _prune(self):
+        """Forgets the oldest finished jobs beyond MAX_FINISHED."""
+        finished = [j for j in self.jobs.values() if not j.active]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Asks a job to stop. Returns the job, or None if there is no such job."""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return job
+        job.progress.cancel_event.set()
+        if job.future.cancel():  # Never started: nothing will run it
+            job.state = "cancelled"
+            job.finished = time.time()
+            JOBS.inc(kind=job.kind, state=job.state)
+        return job
+
+    def snapshot(self, limit=None):
+        """Newest first, without results (those can be big)."""
+        with self.lock:
+            jobs = sorted(self.jobs.values(), key=lambda j: j.id, reverse=True)
+        return [job.snapshot() for job in jobs[:limit]]
+
+    def shutdown(self):
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.active:
+                self.cancel(job.id)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- THE JOB KINDS ---
+def _folder(path):
+    if not path:
+        raise ValueError("'path' is required")
+    path = os.path.abspath(os.path.expanduser(path))
+    if not os.path.isdir(path):
+        raise ValueError(f"Not a folder: {path}")
+    return path
+
+
+def _dupes_params(params):
+    from staff import zero
+    max_memory = params.get("max_memory")
+    try:
+        max_memory = zero.parse_size(str(max_memory)) if max_memory else None
+    except ValueError:
+        raise ValueError(f"Bad max_memory '{params['max_memory']}' (try 512M or 2G)")
+    return {"path": _folder(params.get("path") or "~/Downloads"), "max_memory": max_memory}
+
+
+def _pack_params(params):
+    dest_dir = params.get("dest_dir")
+    return {
+        "path": _folder(params.get("path")),
+        "dest_dir": os.path.abspath(os.path.expanduser(dest_dir)) if dest_dir else None,
+    }
+
+
+@job_kind("dupes", prepare=_dupes_params)
+def hunt_duplicates(params, progress):
+    """params: path (default ~/Downloads), max_memory (e.g. "512M")."""
+    from staff import zero
+    directory = params["path"]
+    groups = zero.Zero().scan_duplicates(directory, max_memory=params["max_memory"], progress=progress)
+    report, wasted = [], 0
+    for paths in groups:
+        try:
+            size = os.path.getsize(paths[0])
+        except OSError:
+            size = 0
+        wasted += size * (len(paths) - 1)
+        report.append({"size": size, "paths": paths})
+    return {"path": directory, "groups": report, "wasted_bytes": wasted}
+
+
+@job_kind("pack", prepare=_pack_params)
+def pack_project(params, progress):
+    """params: path (required), dest_dir (default: Agatha's ARCHIVE_DIR)."""
+    from staff import agatha
+    zip_path = agatha.Agatha().pack_project(params["path"], dest_dir=params["dest_dir"], progress=progress)
+    if zip_path is None:
+        raise RuntimeError("Agatha could not pack the project (see the server log)")
+    return {"archive": zip_path, "bytes": os.path.getsize(zip_path)}
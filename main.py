@@ -1,129 +1,315 @@
 import sys
 import os
+import re
+import time
+import argparse
+import importlib
 import subprocess
-import config  # Import the "Hit List" for Dimitri
-from staff import serge, zero, gustave, dimitri, agatha
+import daemon  # The Lobby client (stdlib only, cheap to import)
+
+# --- THE COMMAND REGISTRY ---
+# Each command names the staff module it needs. That module is only imported
+# when the command is actually dispatched, so `gbh wait` never pays for
+# psutil/watchdog and `gbh backup` never loads Serge.
+COMMANDS = {}
+
+def arg(*args, **kwargs):
+    """An argparse argument spec: arg("port", type=int)"""
+    return (args, kwargs)
+
+def command(name, module, help, *arguments):
+    def register(func):
+        COMMANDS[name] = {"func": func, "module": module, "help": help, "arguments": arguments}
+        return func
+    return register
+
+def load_module(name):
+    """Imports the staff module behind a command (None for staff-less commands)."""
+    module = COMMANDS[name]["module"]
+    return importlib.import_module(module) if module else None
 
 def run_in_background():
     """Detaches the current command into a silent background process"""
     # Remove --bg so the new process doesn't loop infinitely
     args = [arg for arg in sys.argv if arg != "--bg"]
-    
+
     # sys.executable ensures we use the venv python
     subprocess.Popen(
-        [sys.executable] + args, 
-        stdout=subprocess.DEVNULL, 
+        [sys.executable] + args,
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
         start_new_session=True
     )
     print(f"🥷 GBH Background Service Started.")
-    print(f"   (Running '{args[1]} {args[2]}' in the shadows)")
+    print(f"   (Running '{' '.join(args[1:])}' in the shadows)")
 
-def main():
-    # --- 1. HANDLE BACKGROUND REQUESTS ---
-    if "--bg" in sys.argv:
-        run_in_background()
-        return
+def ask_lobby(args):
+    """
+    Forwards the command to the Lobby daemon if it's running.
+    Returns True if the Lobby handled it.
+    """
+    name = args.command
+    if name not in daemon.SERVED_COMMANDS:
+        return False
+
+    # Interactive or blocking jobs stay in this terminal
+    if name == "clean" and args.dupes:
+        return False
+    # (a foreground pack stays here too, so Ctrl-C stops it and its output streams)
+    if name in ("wait", "watch", "patrol", "sort", "pack") and not args.bg:
+        return False
+
+    # The Lobby has its own cwd, so send absolute paths
+    if name == "status":
+        rest = ["--notify"] if args.notify else []
+    elif name == "wait":
+        rest = [str(args.port)]
+    elif name == "watch":
+        rest = [os.path.abspath(os.path.expanduser(args.file))] + ([args.since] if args.since else [])
+    elif name == "pack":
+        rest = [os.path.abspath(os.path.expanduser(args.path))]
+    elif name == "clean":
+        rest = ["--dry-run"] if args.dry_run else []
+    else:
+        rest = []
+
+    reply = daemon.request({"cmd": name, "args": rest, "bg": args.bg})
+    if reply is None:
+        return False
+
+    if not reply.get("ok"):
+        print(f"❌ Lobby: {reply.get('error')}")
+    elif "task" in reply:
+        print(f"🥷 Task #{reply['task']} started in the Lobby ('{' '.join([name] + rest)}').")
+    else:
+        print(reply.get("output", ""), end="")
+    return True
+
+# --- GUSTAVE (System Status) ---
+@command("status", "staff.gustave", "System Health Dashboard",
+         arg("--notify", action="store_true", help="Send a one-line macOS notification instead"))
+def cmd_status(gustave, args):
+    g = gustave.Gustave()
+    if args.notify:
+        g.notify()  # The startup notification
+    else:
+        g.report()  # The text dashboard
+
+# --- SERGE (File Sorter) ---
+@command("sort", "staff.serge", "Start File Sorter (Serge)")
+def cmd_sort(serge, args):
+    serge.start_watch()
+
+# --- ZERO (Cleanup) ---
+@command("clean", "staff.zero", "Sweep Screenshots per SWEEP_RULES (or hunt duplicates with --dupes)",
+         arg("--dupes", nargs="?", const="~/Downloads", metavar="PATH",
+             help="Find duplicates in PATH (default: ~/Downloads)"),
+         arg("--max-memory", metavar="SIZE",
+             help="Memory budget for the duplicate scan, e.g. 512M (spills to disk beyond it)"),
+         arg("--dry-run", action="store_true", help="Show what the sweep would move to the Trash, move nothing"))
+def cmd_clean(zero, args):
+    boy = zero.Zero()
+    if args.dupes:
+        # gbh clean --dupes ~/Pictures [--max-memory 512M]
+        try:
+            max_memory = zero.parse_size(args.max_memory) if args.max_memory else None
+        except ValueError:
+            print(f"❌ Bad --max-memory '{args.max_memory}' (try 512M or 2G)")
+            return
+        boy.find_duplicates(os.path.expanduser(args.dupes), max_memory=max_memory)
+    else:
+        # Default: Sweep screenshots (rules in config.py)
+        try:
+            boy.clean_screenshots(dry_run=args.dry_run)
+        except (ValueError, KeyError, re.error) as e:
+            print(f"❌ Bad SWEEP_RULES in config.py: {e}")
+
+# --- DIMITRI (Monitoring) ---
+@command("wait", "staff.dimitri", "Notify when Port is Ready",
+         arg("port", type=int))
+def cmd_wait(dimitri, args):
+    dimitri.Dimitri().wait_for_port(args.port)
+
+@command("watch", "staff.dimitri", "Notify on Log Errors",
+         arg("file"),
+         arg("--since", metavar="WHEN",
+             help="First report errors logged since WHEN (2h, 30m, '2026-10-19 13:05', "
+                  "or 'last' to resume where the previous watcher stopped)"))
+def cmd_watch(dimitri, args):
+    if args.since and args.since != "last":
+        try:
+            dimitri.parse_when(args.since)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+    dimitri.Dimitri().watch_log(args.file, since=args.since)
 
-    # --- 2. DEFAULT BEHAVIOR (No Args) ---
-    if len(sys.argv) < 2:
-        g = gustave.Gustave()
-        g.report()
+@command("logs", "staff.dimitri", "Search existing logs (indexed, memory-mapped)",
+         arg("action", choices=["search"]),
+         arg("files", nargs="*", metavar="FILE", help="Logs to search (default: PERMANENT_LOGS in config.py)"),
+         arg("-p", "--pattern", action="append", dest="patterns", metavar="REGEX",
+             help="Pattern to look for, repeatable (default: error/exception/traceback/failed/critical)"),
+         arg("--since", metavar="WHEN", help="Only lines logged at or after WHEN (2h, 1d, '2026-10-19 13:05')"),
+         arg("--until", metavar="WHEN", help="Only lines logged before WHEN"),
+         arg("--limit", type=int, default=200, help="Max matches per file (default: 200)"))
+def cmd_logs(dimitri, args):
+    files = args.files
+    if not files:
+        import config
+        files = config.PERMANENT_LOGS
+    if not files:
+        print("📜 No logs given and none in config.PERMANENT_LOGS.")
         return
+    try:
+        dimitri.Dimitri().search_logs(files, args.patterns, args.since, args.until, args.limit)
+    except (ValueError, re.error) as e:
+        print(f"❌ {e}")
+
+@command("patrol", "staff.dimitri", "Watch every port/log in config.py")
+def cmd_patrol(dimitri, args):
+    import config  # The "Hit List" for Dimitri
+    dimitri.Dimitri().start_patrol(config.PERMANENT_PORTS, config.PERMANENT_LOGS)
 
-    command = sys.argv[1].lower()
+@command("tasks", None, "List Lobby background tasks")
+def cmd_tasks(_, args):
+    reply = daemon.request({"cmd": "tasks"})
+    if reply is None:
+        print("🏨 The Lobby is not running (no tasks to list).")
+    elif not reply["tasks"]:
+        print("🏨 No background tasks.")
+    else:
+        for t in reply["tasks"]:
+            print(f"  #{t['id']:<4} {t['command']:<30} up {t['uptime']}s")
 
-    # --- GUSTAVE (System Status) ---
-    if command == "status":
-        g = gustave.Gustave()
-        if "--notify" in sys.argv:
-            g.notify()  # The startup notification
+@command("stop", None, "Stop one (or all) background tasks",
+         arg("id", type=int, nargs="?", help="Lobby task ID (default: everything)"))
+def cmd_stop(_, args):
+    # Stop a single Lobby task: gbh stop <id>
+    if args.id is not None:
+        reply = daemon.request({"cmd": "stop", "id": args.id})
+        if reply and reply["stopped"]:
+            print(f"🔫 Stopped task #{args.id}.")
+        elif reply and reply.get("unstoppable"):
+            print(f"⏳ Task #{args.id} can't be stopped; it will finish on its own.")
         else:
-            g.report()  # The text dashboard
-
-    # --- SERGE (File Sorter) ---
-    elif command == "sort":
-        serge.start_watch()
-
-    # --- ZERO (Cleanup) ---
-    elif command == "clean":
-        boy = zero.Zero()
-        
-        # Check for duplicate flag
-        if "--dupes" in sys.argv:
-            target_dir = os.path.expanduser("~/Downloads")
-            
-            # Logic to handle custom paths: gbh clean --dupes ~/Pictures
-            args = sys.argv
-            for i, arg in enumerate(args):
-                if arg == "--dupes":
-                    if i + 1 < len(args):
-                        target_dir = os.path.expanduser(args[i+1])
-            
-            boy.find_duplicates(target_dir)
+            print(f"❌ No such task: #{args.id}")
+        return
+
+    # Kill switch for background watchers
+    print("🔫 Stopping all GBH background tasks...")
+    reply = daemon.request({"cmd": "stop"})
+    if reply and reply["stopped"]:
+        print(f"   Lobby tasks stopped: {', '.join(f'#{i}' for i in reply['stopped'])}")
+    if reply and reply.get("unstoppable"):
+        print(f"   Still finishing (can't be stopped): {', '.join(f'#{i}' for i in reply['unstoppable'])}")
+    os.system("pkill -f 'gbh wait'")
+    os.system("pkill -f 'gbh watch'")
+    os.system("pkill -f 'gbh patrol'")
+    print("   All watchers terminated.")
+
+# --- AGATHA (Archiving) ---
+@command("pack", "staff.agatha", "Archive Project (Smart Zip)",
+         arg("path", nargs="?", default=".", help="Project folder (default: current folder)"))
+def cmd_pack(agatha, args):
+    agatha.Agatha().pack_project(os.path.expanduser(args.path))
+
+@command("backup", "staff.agatha", "Backup Dotfiles")
+def cmd_backup(agatha, args):
+    agatha.Agatha().backup_config()
+
+# --- PROFILING ---
+@command("profile", None, "Run a command with instrumentation and print a per-phase breakdown",
+         arg("target", nargs=argparse.REMAINDER, metavar="command ...",
+             help="The command to profile, e.g. gbh profile clean --dupes ~/Pictures"))
+def cmd_profile(_, args):
+    if not args.target or args.target[0] in ("profile", "daemon"):
+        print("Usage: gbh profile <command> [args...]")
+        return
+    import telemetry
+    telemetry.enable()
+
+    # Always run locally: the Lobby's numbers would live in another process
+    target = build_parser().parse_args(args.target)
+    start = time.perf_counter()
+    try:
+        COMMANDS[target.command]["func"](load_module(target.command), target)
+    except KeyboardInterrupt:
+        pass  # Long-running watchers: Ctrl-C ends the profile
+    wall = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"📊 PROFILE: gbh {' '.join(args.target)}")
+    print("=" * 60)
+    for line in telemetry.profile_report(wall):
+        print(line)
+
+# --- THE LOBBY (Daemon) ---
+@command("daemon", None, "Manage the Lobby (fast, shared staff daemon)",
+         arg("action", choices=["start", "stop", "stats", "run"]))
+def cmd_daemon(_, args):
+    if args.action == "run":
+        daemon.Lobby().serve()
+
+    elif args.action == "start":
+        if daemon.is_running():
+            print("🏨 The Lobby is already open.")
+        elif daemon.spawn():
+            print(f"🏨 The Lobby is open ({daemon.SOCKET_PATH}).")
         else:
-            # Default: Sweep screenshots
-            boy.clean_screenshots(days_old=1)
-
-    # --- DIMITRI (Monitoring) ---
-    elif command == "wait":
-        # Usage: gbh wait 8000 [--bg]
-        if len(sys.argv) < 3:
-            print("Usage: gbh wait <port> [--bg]")
-            return
-        
-        guard = dimitri.Dimitri()
-        if sys.argv[2].isdigit():
-            guard.wait_for_port(int(sys.argv[2]))
+            print(f"❌ The Lobby failed to start. See {daemon.DAEMON_LOG}")
+
+    elif args.action == "stop":
+        if daemon.request({"cmd": "shutdown"}) is None:
+            print("🏨 The Lobby is not running.")
         else:
-            print("❌ Port must be a number.")
+            print("🏨 The Lobby is closing.")
 
-    elif command == "watch":
-        # Usage: gbh watch error.log [--bg]
-        if len(sys.argv) < 3:
-            print("Usage: gbh watch <file> [--bg]")
+    elif args.action == "stats":
+        start = time.perf_counter()
+        reply = daemon.request({"cmd": "ping"})
+        round_trip = (time.perf_counter() - start) * 1000
+        if reply is None:
+            print("🏨 The Lobby is not running.")
             return
-        guard = dimitri.Dimitri()
-        guard.watch_log(sys.argv[2])
-
-    elif command == "patrol":
-        # Startup routine (reads config.py)
-        guard = dimitri.Dimitri()
-        guard.start_patrol(config.PERMANENT_PORTS, config.PERMANENT_LOGS)
-
-    elif command == "stop":
-        # Kill switch for background watchers
-        print("🔫 Stopping all GBH background tasks...")
-        os.system("pkill -f 'gbh wait'")
-        os.system("pkill -f 'gbh watch'")
-        os.system("pkill -f 'gbh patrol'")
-        print("   All watchers terminated.")
-
-    # --- AGATHA (Archiving) ---
-    elif command == "pack":
-        # Usage: gbh pack [path]
-        target = os.getcwd()
-        if len(sys.argv) > 2:
-            target = sys.argv[2]
-        
-        baker = agatha.Agatha()
-        baker.pack_project(target)
-
-    elif command == "backup":
-        baker = agatha.Agatha()
-        baker.backup_config()
-
-    # --- HELP MENU ---
-    else:
-        print("🏨 GBH Suite Commands:")
-        print("  gbh status           -> System Health Dashboard")
-        print("  gbh sort             -> Start File Sorter (Serge)")
-        print("  gbh clean            -> Sweep Screenshots")
-        print("  gbh clean --dupes    -> Find Duplicates")
-        print("  gbh wait <port>      -> Notify when Port is Ready")
-        print("  gbh watch <file>     -> Notify on Log Errors")
-        print("  gbh pack .           -> Archive Project (Smart Zip)")
-        print("  gbh backup           -> Backup Dotfiles")
+        stats = daemon.request({"cmd": "stats"})["stats"]
+        print(f"🏨 Lobby pid {stats['pid']}, up {stats['uptime']}s, {stats['tasks']} task(s)")
+        print(f"   Cold start (fresh interpreter + staff): {stats['cold_start_ms']:.0f} ms")
+        print(f"   Staff import inside the Lobby:          {stats['import_ms']:.0f} ms (paid once)")
+        print(f"   Socket round-trip:                      {round_trip:.1f} ms")
+        for cmd, t in sorted(stats["commands"].items()):
+            print(f"   {cmd:<10} x{t['count']:<5} avg {t['avg_ms']:.1f} ms")
+
+# --- THE RECEPTION DESK ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gbh", description="🏨 GBH Suite")
+    # --bg is accepted anywhere on the line: gbh wait 8000 --bg
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--bg", action="store_true", help="Run in the background")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+    for name, spec in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=spec["help"], parents=[common])
+        for args, kwargs in spec["arguments"]:
+            sub.add_argument(*args, **kwargs)
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Default behavior (No Args): the status dashboard
+    if not argv:
+        argv = ["status"]
+
+    args = build_parser().parse_args(argv)
+
+    if ask_lobby(args):
+        return
+
+    if args.bg and args.command != "daemon":
+        run_in_background()
+        return
+
+    COMMANDS[args.command]["func"](load_module(args.command), args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,288 @@
+"""
+The Hotel Clock: one scheduler for every periodic staff job.
+
+Jobs get an Interval or a Cron trigger. The scheduler thread sleeps until the
+next job is due (no polling), runs jobs on a bounded worker pool, never lets a
+job overlap with itself, and persists each job's last run so missed runs are
+caught up after a restart or a sleeping laptop.
+"""
+import os
+import json
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import telemetry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BASE_DIR, "scheduler_state.json")
+MAX_CONCURRENT = 2
+
+# Longest single nap. Timed waits run on the monotonic clock, which can stall
+# while a Mac sleeps, so we re-check the wall clock at least this often.
+MAX_SLEEP = 3600
+
+
+# --- TRIGGERS ---
+class Interval:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def next_after(self, ts):
+        return ts + self.seconds
+
+    def __str__(self):
+        return f"every {self.seconds}s"
+
+
+class Cron:
+    """
+    Classic 5-field cron: "minute hour day-of-month month day-of-week".
+    Supports *, */n, a-b, a-b/n and comma lists. Day-of-week: 0 = Sunday.
+    """
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expr):
+        self.expr = expr
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron needs 5 fields, got '{expr}'")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self.RANGES)
+        ]
+        # Standard cron rule: if both day fields are restricted, either may match
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _parse(self, field, lo, hi):
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step = part.split("/")
+                step = int(step)
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = map(int, part.split("-"))
+            else:
+                start = end = int(part)
+            if start < lo or end > hi or step < 1:
+                raise ValueError(f"Cron field '{field}' out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        weekday = (dt.weekday() + 1) % 7  # Python: Monday=0, cron: Sunday=0
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday in self.weekdays
+        if self.any_weekday:
+            return dt.day in self.days
+        return dt.day in self.days or weekday in self.weekdays
+
+    def next_after(self, ts):
+        dt = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ValueError(f"Cron '{self.expr}' never fires")
+
+    def __str__(self):
+        return f"cron '{self.expr}'"
+
+
+# --- JOBS ---
+class Job:
+    def __init__(self, name, trigger, func, jitter=0, catch_up=True):
+        self.name = name
+        self.trigger = trigger
+        self.func = func
+        self.jitter = jitter
+        self.catch_up = catch_up
+
+        self.next_run = None
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+        self.runs = 0
+        self.running = False
+
+    def schedule_from(self, ts):
+        self.next_run = self.trigger.next_after(ts) + random.uniform(0, self.jitter)
+
+    def snapshot(self):
+        fmt = lambda ts: datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else None
+        return {
+            "name": self.name,
+            "trigger": str(self.trigger),
+            "last_run": fmt(self.last_run),
+            "last_duration_ms": round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            "next_run": fmt(self.next_run),
+            "running": self.running,
+            "runs": self.runs,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    def __init__(self, state_file=STATE_FILE, max_concurrent=MAX_CONCURRENT):
+        self.state_file = state_file
+        self.jobs = {}
+        self.cond = threading.Condition()
+        self.save_lock = threading.Lock()  # One writer at a time for the state file
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="gbh-job")
+        self.thread = None
+        self.stopped = False
+        self.state = self._load_state()
+
+    # --- PERSISTENCE ---
+    def _load_state(self):
+        if not self.state_file:
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        # Snapshot inside the save lock too, so an older snapshot never lands last
+        with self.save_lock:
+            with self.cond:
+                for job in self.jobs.values():
+                    if job.last_run:
+                        self.state[job.name] = {"last_run": job.last_run, "last_duration": job.last_duration}
+                data = dict(self.state)
+            try:
+                tmp = self.state_file + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp, self.state_file)
+            except OSError as e:
+                print(f"[GBH] Scheduler could not save state: {e}")
+
+    def seed_last_run(self, name, ts):
+        """Imports a last-run time from somewhere else (e.g. a legacy state file)."""
+        with self.cond:
+            if name not in self.state:
+                self.state[name] = {"last_run": ts, "last_duration": None}
+
+    # --- REGISTRATION ---
+    def add_job(self, name, trigger, func, jitter=0, catch_up=True):
+        job = Job(name, trigger, func, jitter=jitter, catch_up=catch_up)
+        now = time.time()
+        saved = self.state.get(name)
+
+        with self.cond:
+            if saved:
+                job.last_run = saved["last_run"]
+                job.last_duration = saved.get("last_duration")
+                job.schedule_from(job.last_run)
+                if job.next_run <= now and not job.catch_up:
+                    job.schedule_from(now)
+                # else: missed while we were away, so it's due right now
+            elif catch_up:
+                job.next_run = now + random.uniform(0, jitter)  # Never ran: go now
+            else:
+                job.schedule_from(now)
+
+            self.jobs[name] = job
+            self.cond.notify()
+        return job
+
+    def remove_job(self, name):
+        with self.cond:
+            self.jobs.pop(name, None)
+            self.cond.notify()
+
+    def run_now(self, name):
+        with self.cond:
+            if name in self.jobs:
+                self.jobs[name].next_run = time.time()
+                self.cond.notify()
+
+    def snapshot(self):
+        with self.cond:
+            return [job.snapshot() for job in sorted(self.jobs.values(), key=lambda j: j.name)]
+
+    # --- THE LOOP ---
+    def _execute(self, job):
+        start = time.time()
+        try:
+            with telemetry.span(f"job.{job.name}"):
+                job.func()
+            job.last_error = None
+        except Exception as e:
+            job.last_error = str(e)
+            print(f"[GBH] Job {job.name} failed: {e}")
+        finally:
+            with self.cond:
+                job.last_run = start
+                job.last_duration = time.time() - start
+                job.runs += 1
+                job.running = False
+                job.schedule_from(time.time())
+                self.cond.notify()
+            self._save_state()
+
+    def _loop(self):
+        with self.cond:
+            while not self.stopped:
+                now = time.time()
+                for job in list(self.jobs.values()):
+                    if not job.running and job.next_run <= now:
+                        job.running = True
+                        self.pool.submit(self._execute, job)
+
+                waiting = [j.next_run for j in self.jobs.values() if not j.running]
+                timeout = min(waiting) - time.time() if waiting else MAX_SLEEP
+                self.cond.wait(max(0, min(timeout, MAX_SLEEP)))
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="gbh-scheduler", daemon=True)
+        self.thread.start()
+
+    def shutdown(self, wait=False):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# --- THE STAFF ROTA ---
+def zero_sweep():
+    from staff import zero
+    zero.Zero().clean_screenshots()
+
+def serge_catch_up():
+    from staff import serge
+    serge.catch_up()
+
+def register_staff_jobs(scheduler):
+    """Every periodic staff job, in one place."""
+    # Zero: once a day (missed days are caught up at startup)
+    scheduler.add_job("zero.sweep", Cron("0 0 * * *"), zero_sweep, jitter=300)
+    # Serge: sort anything that landed in Downloads while nobody was watching.
+    # Opt-in (SERGE_CATCH_UP in config.py): it moves files the user never asked to sort
+    try:
+        import config
+        catch_up = getattr(config, "SERGE_CATCH_UP", False)
+    except ImportError:
+        catch_up = False
+    if catch_up:
+        scheduler.add_job("serge.catch_up", Interval(3600), serge_catch_up, jitter=60)
+    return scheduler
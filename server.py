@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import psutil
 import shutil
@@ -11,34 +11,54 @@ from datetime import datetime
 
 # --- SETUP PATHS ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-LOG_FILE = os.path.join(BASE_DIR, "zero_last_run.txt")
+LOG_FILE = os.path.join(BASE_DIR, "zero_last_run.txt")  # Legacy: pre-scheduler state
 sys.path.append(BASE_DIR)
 
 # --- IMPORT THE STAFF ---
+import telemetry
+# The server is long-running, so keep the ledger on unless GBH_METRICS=0
+telemetry.enable(os.environ.get("GBH_METRICS") != "0")
+
 from staff import zero
+from scheduler import Scheduler, register_staff_jobs
+from jobs import JobManager
+
+clock = Scheduler()
+back_office = JobManager()
 
 # --- CONNECTION MANAGER ---
 class ConnectionManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        # Set while anyone is watching, so the broadcast loop can sleep otherwise
+        self.has_clients = asyncio.Event()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
+        CLIENTS.inc()
         self.active_connections.append(websocket)
+        self.has_clients.set()
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        if not self.active_connections:
+            self.has_clients.clear()
 
     async def broadcast(self, message: dict):
         for connection in self.active_connections:
             try:
                 await connection.send_json(message)
+                BROADCASTS.inc()
             except Exception:
-                pass
+                SEND_ERRORS.inc()
 
 manager = ConnectionManager()
 
+BROADCASTS = telemetry.counter("gbh_server_broadcasts_total", "Vitals messages sent to dashboards")
+SEND_ERRORS = telemetry.counter("gbh_server_send_errors_total", "WebSocket sends that failed")
+CLIENTS = telemetry.counter("gbh_server_connections_total", "Dashboard WebSocket connections accepted")
+
 # --- HELPER: PERSISTENT MEMORY ---
 def get_last_run_date():
     """Reads the file to see when Zero last worked."""
@@ -51,10 +71,6 @@ def get_last_run_date():
     except Exception:
         return None
 
-def save_last_run_date(date_obj):
-    """Writes today's date to the file."""
-    with open(LOG_FILE, "w") as f:
-        f.write(date_obj.strftime("%Y-%m-%d"))
 
 # --- HELPER: CHECK STAFF ---
 def check_staff_status():
@@ -83,41 +99,38 @@ def get_system_vitals():
         "ram_percent": mem.percent,
         "disk_free": free_gb,
         "cpu_percent": cpu,
-        "staff": staff
+        "staff": staff,
+        "schedule": clock.snapshot(),
+        "jobs": back_office.snapshot(limit=10)
     }
 
 # --- BACKGROUND LOOP ---
 async def broadcast_loop():
+    # Periodic staff jobs (Zero's daily sweep etc.) live in the scheduler now,
+    # so this loop only has to push vitals, and only while someone is watching.
     while True:
-        # 1. SEND VITALS (Fast)
-        if manager.active_connections:
+        await manager.has_clients.wait()
+        with telemetry.span("server.vitals"):
             data = get_system_vitals()
+        with telemetry.span("server.broadcast"):
             await manager.broadcast(data)
-        
-        # 2. CHECK ZERO SCHEDULE (Daily)
-        # We read from the file so this persists across reboots
-        today = datetime.now().date()
-        last_run = get_last_run_date()
-
-        if last_run != today:
-            # If the dates don't match, it means we haven't cleaned TODAY yet.
-            print(f"[GBH] New day detected ({today}). Running Zero...")
-            try:
-                boy = zero.Zero()
-                boy.clean_screenshots(days_old=0)
-                # Save the date so we don't run again until tomorrow
-                save_last_run_date(today)
-            except Exception as e:
-                print(f"[GBH] Zero failed: {e}")
-
         await asyncio.sleep(1)
 
 # --- APP LIFECYCLE ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Carry over the old once-a-day marker so an upgrade doesn't re-sweep today
+    last_run = get_last_run_date()
+    if last_run:
+        clock.seed_last_run("zero.sweep", datetime.combine(last_run, datetime.min.time()).timestamp())
+
+    register_staff_jobs(clock)
+    clock.start()
     task = asyncio.create_task(broadcast_loop())
     yield
     task.cancel()
+    clock.shutdown()
+    back_office.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
@@ -140,13 +153,56 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(telemetry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/schedule")
+def schedule():
+    return JSONResponse({"jobs": clock.snapshot()})
+
+# --- JOBS (long-running staff work, off the event loop) ---
+@app.post("/api/jobs")
+def create_job(payload: dict):
+    """Body: {"kind": "dupes" | "pack", "path": "...", ...}. Progress streams over /ws/vitals."""
+    params = dict(payload)
+    try:
+        job = back_office.submit(params.pop("kind", None), params)
+    except ValueError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    return JSONResponse({"status": "queued", "job": job.snapshot()}, status_code=202)
+
+@app.get("/api/jobs")
+def list_jobs():
+    return JSONResponse({"jobs": back_office.snapshot()})
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: int):
+    job = back_office.get(job_id)
+    if job is None:
+        return JSONResponse({"status": "error", "message": f"No such job: {job_id}"}, status_code=404)
+    return JSONResponse(job.snapshot(result=True))
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(job_id: int):
+    job = back_office.cancel(job_id)
+    if job is None:
+        return JSONResponse({"status": "error", "message": f"No such job: {job_id}"}, status_code=404)
+    return JSONResponse(job.snapshot())
+
 @app.post("/api/clean")
-async def run_cleaner():
+async def run_cleaner(dry_run: bool = False):
     try:
         boy = zero.Zero()
-        boy.clean_screenshots(days_old=0)
+        # The sweep touches the disk: run it in a thread so the vitals stream keeps flowing.
+        # Manual clicks sweep every match now (days_old=0), regardless of the age rules.
+        swept = await asyncio.to_thread(boy.clean_screenshots, days_old=0, dry_run=dry_run)
         # Note: We do NOT update the daily log here. 
         # Manual clicks are "extra" cleanings, they shouldn't stop the daily schedule.
-        return JSONResponse({"status": "success", "message": "Zero has swept the Desktop screenshots."})
+        if dry_run:
+            message = f"Zero would sweep {len(swept)} file(s)."
+        else:
+            message = f"Zero has swept {sum(1 for s in swept if s['trashed_as'])} file(s) to the Trash."
+        return JSONResponse({"status": "success", "message": message, "files": swept[:100]})
     except Exception as e:
         return JSONResponse({"status": "error", "message": str(e)})
\ No newline at end of file
@@ -1,7 +1,9 @@
 import os
 import shutil
+import threading
 import datetime
 import zipfile
+import telemetry
 
 # --- CONFIGURATION ---
 ARCHIVE_DIR = os.path.expanduser("~/Documents/Archives")
@@ -20,51 +22,76 @@ BLACKLIST = [
     "build"
 ]
 
-class Agatha:
-    def __init__(self):
-        # Ensure destination folders exist
-        if not os.path.exists(ARCHIVE_DIR):
-            os.makedirs(ARCHIVE_DIR)
-        if not os.path.exists(BACKUP_DIR):
-            os.makedirs(BACKUP_DIR)
+# --- TELEMETRY ---
+FILES_PACKED = telemetry.counter("gbh_agatha_files_packed_total", "Files Agatha added to archives")
+BYTES_PACKED = telemetry.counter("gbh_agatha_bytes_compressed_total", "Uncompressed bytes Agatha fed to zip")
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
 
+class Agatha:
     def log(self, msg):
         print(f"🧁 {msg}")
 
     # --- JOB 1: SMART PROJECT ARCHIVING ---
-    def pack_project(self, source_path):
+    def pack_project(self, source_path, dest_dir=None, progress=None):
+        """`progress` (see jobs.Progress) receives files_packed/bytes_compressed updates."""
+        dest_dir = dest_dir or ARCHIVE_DIR
+        os.makedirs(dest_dir, exist_ok=True)
         source_path = os.path.abspath(source_path)
         project_name = os.path.basename(source_path)
         
         # Timestamp: project_2023-10-27.zip
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d")
         zip_name = f"{project_name}_{timestamp}.zip"
-        zip_path = os.path.join(ARCHIVE_DIR, zip_name)
+        zip_path = os.path.join(dest_dir, zip_name)
+        # Built under a private name: an unfinished box never replaces today's earlier one
+        part_path = f"{zip_path}.{os.getpid()}-{threading.get_ident()}.part"
         
         self.log(f"Baking a Mendl's Box for: {project_name}")
         self.log(f"Excluding junk: {', '.join(BLACKLIST)}")
 
         try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(source_path):
-                    # Modify dirs in-place to skip blacklisted folders
-                    dirs[:] = [d for d in dirs if d not in BLACKLIST]
-                    
-                    for file in files:
-                        if file in BLACKLIST: continue
-                        
-                        file_path = os.path.join(root, file)
-                        # Calculate path relative to the source folder
-                        arcname = os.path.relpath(file_path, source_path)
+            # Walk first, so the progress report knows how many bytes are coming
+            if progress: progress.start_phase("walking")
+            to_pack = []
+            for root, dirs, files in os.walk(source_path):
+                # Modify dirs in-place to skip blacklisted folders
+                dirs[:] = [d for d in dirs if d not in BLACKLIST]
+                
+                for file in files:
+                    if file in BLACKLIST: continue
+                    to_pack.append(os.path.join(root, file))
+            if progress:
+                progress.start_phase("compressing", total=sum(_size(p) for p in to_pack), key="bytes_compressed")
+
+            with zipfile.ZipFile(part_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for file_path in to_pack:
+                    # Calculate path relative to the source folder
+                    arcname = os.path.relpath(file_path, source_path)
+                    with telemetry.span("agatha.compress"):
                         zipf.write(file_path, arcname)
+                    size = zipf.filelist[-1].file_size
+                    FILES_PACKED.inc()
+                    BYTES_PACKED.inc(size)
+                    if progress: progress.add(files_packed=1, bytes_compressed=size)
+            os.replace(part_path, zip_path)
             
             # Check size
             size_mb = os.path.getsize(zip_path) / (1024 * 1024)
             self.log(f"Done! Archive saved to: {zip_path}")
             self.log(f"Final Size: {size_mb:.2f} MB")
+            return zip_path
             
         except Exception as e:
             print(f"❌ Error packing project: {e}")
+        finally:
+            # Failed, cancelled or interrupted: don't leave half a box behind
+            if os.path.exists(part_path):
+                os.remove(part_path)
 
     # --- JOB 2: DOTFILE BACKUP ---
     def backup_config(self):
@@ -77,6 +104,7 @@ class Agatha:
             # Add other config files here
         ]
         
+        os.makedirs(BACKUP_DIR, exist_ok=True)
         self.log("Backing up critical configuration files...")
         
         for path in files_to_save:
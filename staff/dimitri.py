@@ -1,13 +1,262 @@
 import time
 import os
+import re
 import sys
+import json
+import mmap
+import bisect
 import socket
 import urllib.request
 import threading
 from urllib.error import URLError
+import telemetry
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, saves still merge
+    fcntl = None
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRIGGERS = ["error", "exception", "traceback", "failed", "critical"]
+
+# Log index
+LOG_INDEX_FILE = os.path.join(BASE_DIR, "dimitri_log_index.json")
+INDEX_STRIDE = 1024 * 1024    # One timestamp checkpoint per MB of log
+STAMP_WINDOW = 64 * 1024      # How far past a checkpoint to look for a stamped line
+TAIL_SAVE_EVERY = 5           # Seconds between saving a watcher's read position
+SCAN_CHUNK = 8 * 1024 * 1024  # Bytes lowercased at a time by the word scanner
+
+# "2026-10-19 13:05:00", "2026-10-19T13:05:00" or "[2026-10-19 13:05:00]" at the start of a line.
+# ISO stamps sort as plain bytes, so range checks never parse a date.
+STAMP_RE = re.compile(rb"^\[?(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})", re.M)
+DURATION_RE = re.compile(r"^(\d+)([smhd])$")
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# --- TELEMETRY ---
+PROBES = telemetry.counter("gbh_dimitri_probes_total", "Port probes Dimitri has made")
+ALERTS = telemetry.counter("gbh_dimitri_alerts_total", "Notifications Dimitri has sent")
+ERRORS = telemetry.counter("gbh_dimitri_errors_total", "Unexpected failures inside Dimitri's watchers")
+BYTES_SCANNED = telemetry.counter("gbh_dimitri_bytes_scanned_total", "Log bytes Dimitri has searched")
+
+
+class Matcher:
+    """
+    Every pattern compiled into one case-insensitive regex (used on live lines,
+    and on files when a pattern is a real regex). When all patterns are plain
+    words, like the default TRIGGERS, bulk scans skip sre's slow case-insensitive
+    alternation: each line-aligned chunk is lowercased once and searched with
+    bytes.find.
+    """
+    def __init__(self, patterns=None):
+        patterns = patterns or TRIGGERS
+        self.regex = re.compile("|".join(f"(?:{p})" for p in patterns).encode(), re.I)
+        literal = all(re.escape(p) == p for p in patterns)
+        self.words = [p.lower().encode() for p in patterns] if literal else None
+
+    def search(self, line):
+        return self.regex.search(line)
+
+    def lines(self, mm, start, end):
+        """Yields (line_start, line_end) for every matching line in mm[start:end]."""
+        if self.words is None:
+            yield from self._regex_lines(mm, start, end)
+            return
+
+        pos = start
+        while pos < end:
+            stop = min(pos + SCAN_CHUNK, end)
+            if stop < end:
+                newline = mm.find(b"\n", stop, end)  # Finish the line
+                stop = end if newline == -1 else newline + 1
+            chunk = mm[pos:stop].lower()
+
+            line_starts = set()
+            for word in self.words:
+                i = chunk.find(word)
+                while i != -1:
+                    line_starts.add(chunk.rfind(b"\n", 0, i) + 1)
+                    newline = chunk.find(b"\n", i)
+                    i = -1 if newline == -1 else chunk.find(word, newline + 1)
+            for line_start in sorted(line_starts):
+                line_end = chunk.find(b"\n", line_start)
+                yield pos + line_start, pos + (len(chunk) if line_end == -1 else line_end)
+            pos = stop
+
+    def _regex_lines(self, mm, start, end):
+        pos = start
+        while pos < end:
+            m = self.regex.search(mm, pos, end)
+            if not m:
+                return
+            line_start = max(mm.rfind(b"\n", start, m.start()) + 1, start)
+            line_end = mm.find(b"\n", m.end(), end)
+            if line_end == -1:
+                line_end = end
+            yield line_start, line_end
+            pos = line_end + 1
+
+
+def parse_when(value):
+    """'90m', '2h', '1d', '2026-10-19' or '2026-10-19 13:05' -> a comparable stamp (bytes)."""
+    value = value.strip()
+    m = DURATION_RE.match(value)
+    if m:
+        then = time.time() - int(m.group(1)) * UNITS[m.group(2)]
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(then)).encode()
+
+    value = value.replace("T", " ")
+    if not re.match(r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?)?$", value):
+        raise ValueError(f"Can't read the time '{value}' (try 2h, 30m, 1d or '2026-10-19 13:05').")
+    # Pad to a full stamp: '2026-10-19' -> '2026-10-19 00:00:00'
+    return (value + " 00:00:00"[len(value) - 10:]).encode()
+
+
+def _stamp(match):
+    return match.group(1) + b" " + match.group(2)
+
+
+# --- THE LOG INDEX ---
+class LogIndex:
+    """
+    A sparse timestamp -> byte offset map for each log (one checkpoint per
+    INDEX_STRIDE bytes), plus where the last watcher stopped reading.
+    Persisted, so neither a time-range search nor a restarted watcher has to
+    read a log from the top. A new inode or a shrunken file (rotation,
+    truncation) resets that log's entry.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, index_file=LOG_INDEX_FILE):
+        self.index_file = index_file
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.dirty = set()  # Logs this process changed since the last save
+
+    @classmethod
+    def shared(cls, index_file=LOG_INDEX_FILE):
+        """One index per file per process, so watchers in the same daemon don't overwrite each other."""
+        with cls._shared_lock:
+            if index_file not in cls._shared:
+                cls._shared[index_file] = cls(index_file)
+            return cls._shared[index_file]
+
+    def _load(self):
+        try:
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _merge(mine, theirs):
+        """Same log in both: keep whichever indexed further, and the furthest tail."""
+        if theirs is None or theirs.get("inode") != mine["inode"]:
+            return mine
+        merged = dict(mine if mine["next"] >= theirs.get("next", 0) else theirs)
+        tails = [t for t in (mine["tail"], theirs.get("tail")) if t is not None]
+        merged["tail"] = max(tails) if tails else None
+        return merged
+
+    def save(self):
+        """
+        Re-reads the file under a lock and merges in the logs this process
+        changed, so other processes' watchers keep their entries.
+        """
+        with self.lock:
+            try:
+                with open(self.index_file + ".lock", "a") as lock:
+                    if fcntl:
+                        fcntl.flock(lock, fcntl.LOCK_EX)
+                    entries = self._load()
+                    for key in self.dirty:
+                        if key in self.entries:
+                            entries[key] = self._merge(self.entries[key], entries.get(key))
+                    # Forget logs that no longer exist
+                    self.entries = {p: e for p, e in entries.items() if os.path.exists(p)}
+                    tmp = f"{self.index_file}.{os.getpid()}.tmp"
+                    with open(tmp, "w") as f:
+                        json.dump(self.entries, f)
+                    os.replace(tmp, self.index_file)
+                self.dirty.clear()
+            except OSError:
+                pass
+
+    def _entry(self, filepath, st):
+        key = os.path.abspath(filepath)
+        e = self.entries.get(key)
+        if e is None or e["inode"] != st.st_ino or e["size"] > st.st_size:
+            e = self.entries[key] = {"inode": st.st_ino, "size": 0, "next": 0, "points": [], "tail": None}
+        self.dirty.add(key)
+        return e
+
+    def update(self, filepath, mm):
+        """Adds checkpoints for bytes appended since the last call. Returns (offsets, stamps)."""
+        size = len(mm)
+        with self.lock:
+            e = self._entry(filepath, os.stat(filepath))
+            points = e["points"]
+            pos = e["next"]
+            while pos < size:
+                m = STAMP_RE.search(mm, pos, min(pos + STAMP_WINDOW, size))
+                if m and (not points or m.start() > points[-1][0]):
+                    points.append([m.start(), _stamp(m).decode()])
+                pos += INDEX_STRIDE
+            e["next"] = pos
+            e["size"] = size
+            return [p[0] for p in points], [p[1].encode() for p in points]
+
+    @staticmethod
+    def seek(mm, offsets, stamps, stamp):
+        """Offset of the first line stamped at or after `stamp`: one bisect, then at most one stride of scanning."""
+        i = bisect.bisect_left(stamps, stamp)
+        start = offsets[i - 1] if i else 0
+        end = offsets[i] if i < len(offsets) else len(mm)
+        for m in STAMP_RE.finditer(mm, start, end):
+            if _stamp(m) >= stamp:
+                return m.start()
+        return end
+
+    def tail(self, filepath):
+        """Where the last watcher stopped (0 if the log was rotated since, None if never watched)."""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        with self.lock:
+            e = self.entries.get(os.path.abspath(filepath))
+            if e is None or e["tail"] is None:
+                return None
+            if e["inode"] != st.st_ino or e["tail"] > st.st_size:
+                return 0
+            return e["tail"]
+
+    def set_tail(self, filepath, offset):
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return # Deleted while we watched it
+        with self.lock:
+            self._entry(filepath, st)["tail"] = offset
+
 
 class Dimitri:
+    def __init__(self):
+        # Set to stand every watcher down (used by the daemon's `stop <id>`)
+        self.stop_event = threading.Event()
+        self.index = LogIndex.shared()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _failed(self, job, error):
+        """Watchers run unattended: count and log failures instead of swallowing them."""
+        ERRORS.inc(job=job)
+        print(f"⚠️  Dimitri ({job}) stopped: {type(error).__name__}: {error}", file=sys.stderr)
+
     def _notify(self, title, message):
+        ALERTS.inc()
         safe_msg = message.replace('"', '\\"')
         safe_title = title.replace('"', '\\"')
         os.system(f"""osascript -e 'display notification "{safe_msg}" with title "{safe_title}"'""")
@@ -18,59 +267,184 @@ class Dimitri:
         # We don't print to console here because this runs in background
         
         try:
-            while True:
+            while not self.stop_event.is_set():
                 try:
-                    with urllib.request.urlopen(url, timeout=1) as response:
+                    PROBES.inc()
+                    with telemetry.span("dimitri.probe"), urllib.request.urlopen(url, timeout=1) as response:
                         if response.status == 200:
                             self._notify("System Ready 🚀", f"Port {port} is now active.")
                             return # Job done, stop watching this port
                 except (URLError, ConnectionRefusedError, socket.timeout):
-                    time.sleep(2) # Check every 2 seconds
-        except Exception:
-            pass
+                    self.stop_event.wait(2) # Check every 2 seconds
+        except Exception as e:
+            self._failed(f"wait:{port}", e)
+
+    def _port_probe(self, clock, port):
+        """A single check for the scheduler; retires itself once the port answers."""
+        url = f"http://localhost:{port}"
+
+        def probe():
+            PROBES.inc()
+            try:
+                with telemetry.span("dimitri.probe"), urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        self._notify("System Ready 🚀", f"Port {port} is now active.")
+                        clock.remove_job(f"dimitri.port.{port}")
+            except (URLError, ConnectionRefusedError, socket.timeout):
+                pass
+        return probe
 
     # --- JOB 2: THE SENTINEL ---
-    def watch_log(self, filepath):
+    def watch_log(self, filepath, since=None):
+        """
+        Tails a log and alerts on trigger words. With `since` (see parse_when, or
+        'last' to resume where the previous watcher stopped) it first reports
+        what was logged in the meantime, then keeps tailing.
+        """
         if not os.path.exists(filepath): return
 
-        triggers = ["error", "exception", "traceback", "failed", "critical"]
-        
+        matcher = Matcher()
+        name = os.path.basename(filepath)
+
         try:
-            with open(filepath, "r") as f:
-                f.seek(0, 2) # Go to end
-                while True:
+            offset = self._catch_up(filepath, since) if since else None
+            last_save, saved = time.monotonic(), None
+            with open(filepath, "rb") as f:
+                if offset is None:
+                    f.seek(0, 2) # Go to end
+                else:
+                    f.seek(offset)
+                while not self.stop_event.is_set():
                     line = f.readline()
-                    if not line:
-                        time.sleep(0.5)
-                        continue
-                    
-                    if any(t in line.lower() for t in triggers):
-                        self._notify("Log Alert ⚠️", f"{os.path.basename(filepath)}: Error detected")
-        except Exception:
-            pass
+                    if line.endswith(b"\n"):
+                        if matcher.search(line):
+                            self._notify("Log Alert ⚠️", f"{name}: Error detected")
+                    else:
+                        f.seek(-len(line), 1) # Nothing new, or a half-written line: wait for the rest
+                        self.stop_event.wait(0.5)
+
+                    # Only when something was read: an idle watcher does no file I/O
+                    if time.monotonic() - last_save > TAIL_SAVE_EVERY and f.tell() != saved:
+                        saved = f.tell()
+                        self._save_tail(filepath, saved)
+                        last_save = time.monotonic()
+                if f.tell() != saved:
+                    self._save_tail(filepath, f.tell())
+        except Exception as e:
+            self._failed(f"watch:{name}", e)
+
+    def _save_tail(self, filepath, offset):
+        self.index.set_tail(filepath, offset)
+        self.index.save()
+
+    def _catch_up(self, filepath, since):
+        """Reports matches logged since `since`. Returns the offset to resume tailing from."""
+        name = os.path.basename(filepath)
+        size = os.path.getsize(filepath)
+        if since == "last":
+            start = self.index.tail(filepath)
+            if start is None:
+                return None # Never watched before: behave like a fresh watcher
+            hits, _ = self.search_log(filepath, start=start, end=size)
+            label = "since the last watch"
+        else:
+            hits, _ = self.search_log(filepath, since=parse_when(since), end=size)
+            label = f"since {since}"
+
+        for offset, line in hits:
+            print(f"   {name}:{offset}  {line}")
+        if hits:
+            self._notify("Log Alert ⚠️", f"{name}: {len(hits)} error line(s) {label}")
+        return size
+
+    # --- JOB 2b: THE ARCHIVIST ---
+    def search_log(self, filepath, patterns=None, since=None, until=None, start=None, end=None, limit=None):
+        """
+        Finds lines matching any of `patterns` (regexes; default TRIGGERS) in an
+        existing log. The file is memory-mapped and searched by a Matcher;
+        `since`/`until` stamps (see parse_when) are turned into byte
+        offsets through the LogIndex, so only that slice of the file is read.
+        Returns ([(offset, line), ...], bytes_scanned).
+        """
+        matcher = Matcher(patterns)
+        hits = []
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return hits, 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = size if end is None else min(end, size)
+                start = start or 0
+                if since or until:
+                    with telemetry.span("dimitri.index"):
+                        offsets, stamps = self.index.update(filepath, mm)
+                        if not stamps:
+                            print(f"⚠️  {os.path.basename(filepath)} has no timestamps; searching all of it.",
+                                  file=sys.stderr)
+                        else:
+                            if since:
+                                start = max(start, self.index.seek(mm, offsets, stamps, since))
+                            if until:
+                                end = min(end, self.index.seek(mm, offsets, stamps, until))
+                    self.index.save()
+
+                with telemetry.span("dimitri.search"):
+                    scanned_to = end
+                    for line_start, line_end in matcher.lines(mm, start, end):
+                        hits.append((line_start, mm[line_start:line_end].decode(errors="replace").rstrip("\r")))
+                        if limit is not None and len(hits) >= limit:
+                            scanned_to = line_end
+                            break
+                scanned = max(0, scanned_to - start)
+        BYTES_SCANNED.inc(scanned)
+        return hits, scanned
+
+    def search_logs(self, files, patterns=None, since=None, until=None, limit=200):
+        """`gbh logs search`: prints the matching lines of each log, oldest first."""
+        since = parse_when(since) if since else None
+        until = parse_when(until) if until else None
+
+        for filepath in files:
+            filepath = os.path.expanduser(filepath)
+            if not os.path.isfile(filepath):
+                print(f"❌ No such log: {filepath}")
+                continue
+            start = time.perf_counter()
+            hits, scanned = self.search_log(filepath, patterns, since, until, limit=limit)
+            elapsed = (time.perf_counter() - start) * 1000
+
+            print(f"📜 {filepath}")
+            for offset, line in hits:
+                print(f"   {line}")
+            more = "+" if limit is not None and len(hits) >= limit else ""
+            size = os.path.getsize(filepath)
+            print(f"   {len(hits)}{more} match(es) · scanned {scanned / 1e6:.1f} of {size / 1e6:.1f} MB "
+                  f"in {elapsed:.0f} ms\n")
 
     # --- JOB 3: THE PATROL (Multitasking) ---
     def start_patrol(self, ports, logs):
         print(f"🕵️ Dimitri is starting patrol...")
         
-        # 1. Start Port Watchers
+        # 1. Start Port Watchers (one scheduled probe per port, no sleeping threads)
+        from scheduler import Scheduler, Interval
+        clock = Scheduler(state_file=None, max_concurrent=4)
         for port in ports:
-            t = threading.Thread(target=self.wait_for_port, args=(port,))
-            t.daemon = True
-            t.start()
+            clock.add_job(f"dimitri.port.{port}", Interval(2), self._port_probe(clock, port))
             print(f"   - Watching Port {port}")
+        clock.start()
 
         # 2. Start Log Watchers
         for log_path in logs:
             if os.path.exists(log_path):
-                t = threading.Thread(target=self.watch_log, args=(log_path,))
+                # Resume where the last patrol stopped, so nothing logged in between is missed
+                t = threading.Thread(target=self.watch_log, args=(log_path, "last"))
                 t.daemon = True
                 t.start()
                 print(f"   - Watching Log {os.path.basename(log_path)}")
 
         # Keep the main thread alive so the helper threads don't die
         try:
-            while True:
-                time.sleep(1)
+            self.stop_event.wait()
         except KeyboardInterrupt:
-            pass
\ No newline at end of file
+            self.stop()
+        clock.shutdown()
\ No newline at end of file
@@ -1,13 +1,42 @@
 import os
+import json
+import configparser
+import time
 import shutil
+import struct
 import subprocess
 import psutil
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import telemetry
 
 # --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECTS_DIR = os.path.expanduser("~/Documents/Projects")
 CRITICAL_PORTS = [3000, 5432, 6379, 8000, 8080]
 
+# Repo scanning
+GIT_CACHE_FILE = os.path.join(BASE_DIR, "gustave_git_cache.json")
+REPO_SCAN_DEPTH = 3      # How many folders deep to look for nested clones
+REPO_SCAN_WORKERS = 8    # Parallel git processes
+REPO_SKIP_DIRS = {"node_modules", "venv", ".venv", "env", "__pycache__", "dist", "build"}
+INDEX_STAT_LIMIT = 1000  # Past this many tracked files, git status beats our own stats
+
+# --- TELEMETRY ---
+GIT_CALLS = telemetry.counter("gbh_gustave_git_calls_total", "git status subprocesses Gustave spawned")
+CACHE_HITS = telemetry.counter("gbh_gustave_cache_hits_total", "Repos answered from Gustave's cache")
+
+def _index_varint(data, pos):
+    """git's offset varint (index v4 path prefixes). Returns (value, next_pos)."""
+    byte = data[pos]
+    value = byte & 0x7f
+    pos += 1
+    while byte & 0x80:
+        byte = data[pos]
+        value = ((value + 1) << 7) | (byte & 0x7f)
+        pos += 1
+    return value, pos
+
 # --- COLORS ---
 class Colors:
     HEADER = '\033[95m'
@@ -18,6 +47,265 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# --- REPO STATE ENGINE ---
+class RepoScanner:
+    """
+    Checks every clone under PROJECTS_DIR in parallel.
+    Cheap checks run first: if the repo's index/HEAD/refs are untouched and no
+    tracked file is newer than the last scan, the cached state is reused and
+    git is never spawned. Big repos always go to git, whose own stat loop is
+    faster than ours.
+    """
+    def __init__(self, root=PROJECTS_DIR, max_depth=REPO_SCAN_DEPTH,
+                 workers=REPO_SCAN_WORKERS, cache_file=GIT_CACHE_FILE):
+        self.root = root
+        self.max_depth = max_depth
+        self.workers = workers
+        self.cache_file = cache_file
+        self.cache = self._load_cache()
+
+    # --- CACHE ---
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            tmp = self.cache_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.cache, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass
+
+    # --- DISCOVERY ---
+    def discover(self):
+        """Finds repos recursively (up to max_depth), without descending into them."""
+        repos = []
+        stack = [(self.root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            if any(e.name == ".git" for e in entries):
+                repos.append(path)
+                continue
+            if depth >= self.max_depth:
+                continue
+
+            for e in entries:
+                if e.name.startswith(".") or e.name in REPO_SKIP_DIRS:
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    stack.append((e.path, depth + 1))
+        return sorted(repos)
+
+    # --- CHEAP CHECKS ---
+    def _git_dir(self, repo):
+        dot_git = os.path.join(repo, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        # Worktrees and submodules use a ".git" file pointing elsewhere
+        try:
+            with open(dot_git, "r") as f:
+                line = f.read().strip()
+            if line.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(repo, line[7:].strip()))
+        except OSError:
+            pass
+        return dot_git
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _common_dir(self, git_dir):
+        """Worktrees keep HEAD and index in their own git dir, but refs and config in the main one."""
+        try:
+            with open(os.path.join(git_dir, "commondir"), "r") as f:
+                return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+        except OSError:
+            return git_dir
+
+    def _upstream_ref(self, common_dir, branch_ref):
+        """The remote-tracking ref `git push`/`fetch` update for this branch (from branch.<name>.remote/merge)."""
+        if not branch_ref.startswith("refs/heads/"):
+            return ""
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read(os.path.join(common_dir, "config"))
+            section = parser[f'branch "{branch_ref[11:]}"']
+            remote, merge = section["remote"].strip('"'), section["merge"].strip('"')
+        except (configparser.Error, KeyError, UnicodeDecodeError):
+            return ""
+        if not merge.startswith("refs/heads/"):
+            return ""
+        if remote == ".":
+            return os.path.join(common_dir, merge)
+        return os.path.join(common_dir, "refs", "remotes", remote, merge[11:])
+
+    def _fingerprint(self, repo):
+        """mtimes of everything that changes on stage, commit, checkout, fetch or push."""
+        git_dir = self._git_dir(repo)
+        common_dir = self._common_dir(git_dir)
+        ref_path = upstream_path = ""
+        try:
+            with open(os.path.join(git_dir, "HEAD"), "r") as f:
+                head = f.read().strip()
+            if head.startswith("ref:"):
+                branch_ref = head[4:].strip()
+                ref_path = os.path.join(common_dir, branch_ref)
+                upstream_path = self._upstream_ref(common_dir, branch_ref)
+        except OSError:
+            pass
+
+        return [
+            self._mtime(os.path.join(git_dir, "index")),
+            self._mtime(os.path.join(git_dir, "HEAD")),
+            self._mtime(ref_path) if ref_path else 0,
+            self._mtime(upstream_path) if upstream_path else 0,  # Moves on push: ahead/behind
+            self._mtime(os.path.join(common_dir, "config")),     # Upstream (re)configured
+            self._mtime(os.path.join(common_dir, "packed-refs")),
+            self._mtime(os.path.join(common_dir, "FETCH_HEAD")),
+        ]
+
+    def _tracked_paths(self, git_dir):
+        """
+        Paths listed in the git index (formats v2-v4), or None if the index
+        can't be read or tracks more than INDEX_STAT_LIMIT files.
+        """
+        try:
+            with open(os.path.join(git_dir, "index"), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < 12 or data[:4] != b"DIRC":
+            return None
+        version, count = struct.unpack(">II", data[4:12])
+        if version not in (2, 3, 4) or count > INDEX_STAT_LIMIT:
+            return None
+
+        paths, pos, prev = [], 12, b""
+        try:
+            for _ in range(count):
+                flags = struct.unpack_from(">H", data, pos + 60)[0]
+                start = pos + 62 + (2 if version >= 3 and flags & 0x4000 else 0)
+                if version == 4:
+                    # Each path drops `strip` bytes off the previous one and appends the rest
+                    strip, start = _index_varint(data, start)
+                    end = data.index(b"\0", start)
+                    path = prev[:len(prev) - strip] + data[start:end]
+                    pos = end + 1
+                else:
+                    end = data.index(b"\0", start)
+                    path = data[start:end]
+                    pos += ((end - pos) // 8 + 1) * 8  # Entries are NUL-padded to a multiple of 8
+                prev = path
+                paths.append(os.fsdecode(path))
+            # Split and sparse indexes don't list every tracked file here: leave them to git
+            while pos + 8 <= len(data) - 20:
+                signature, size = struct.unpack_from(">4sI", data, pos)
+                if signature in (b"link", b"sdir"):
+                    return None
+                pos += 8 + size
+        except (struct.error, ValueError, IndexError):
+            return None
+        return paths
+
+    def _tracked_changed(self, repo, stamp):
+        """
+        True if a tracked file was modified (or removed) after `stamp`, None if
+        that can't be told cheaply. Untracked files never matter here: git
+        status runs with --untracked-files=no anyway.
+        """
+        paths = self._tracked_paths(self._git_dir(repo))
+        if paths is None:
+            return None
+        for rel in paths:
+            try:
+                st = os.lstat(os.path.join(repo, rel))
+            except OSError:
+                return True
+            # ctime too: catches chmod and tools that restore the old mtime
+            if st.st_mtime_ns > stamp or st.st_ctime_ns > stamp:
+                return True
+        return False
+
+    # --- THE ACTUAL GIT CALL ---
+    def _git_status(self, repo):
+        # Repos that enabled core.fsmonitor get it from their own config
+        cmd = ["git", "status", "--porcelain=v2", "--branch", "--untracked-files=no"]
+
+        GIT_CALLS.inc()
+        with telemetry.span("gustave.git"):
+            res = subprocess.run(cmd, cwd=repo, capture_output=True, text=True)
+        if res.returncode != 0:
+            return {"error": res.stderr.strip() or "git status failed"}
+
+        state = {"dirty": False, "changes": 0, "branch": None, "ahead": 0, "behind": 0}
+        for line in res.stdout.splitlines():
+            if line.startswith("# branch.head "):
+                state["branch"] = line[14:]
+            elif line.startswith("# branch.ab "):
+                ahead, behind = line[12:].split()
+                state["ahead"] = int(ahead)
+                state["behind"] = abs(int(behind))
+            elif line and not line.startswith("#"):
+                state["changes"] += 1
+        state["dirty"] = state["changes"] > 0
+        return state
+
+    def check_repo(self, repo):
+        start = time.perf_counter()
+        fingerprint = self._fingerprint(repo)
+        cached = self.cache.get(repo)
+
+        with telemetry.span("gustave.cheap_check"):
+            fresh = (cached and cached.get("fingerprint") == fingerprint
+                     and self._tracked_changed(repo, cached["checked_at"]) is False)
+        if fresh:
+            CACHE_HITS.inc()
+            state = dict(cached["state"])
+            state["cached"] = True
+        else:
+            checked_at = time.time_ns()
+            state = self._git_status(repo)
+            if "error" not in state:
+                # Re-read: git status may have refreshed the index while it ran
+                fingerprint = self._fingerprint(repo)
+                self.cache[repo] = {"fingerprint": fingerprint, "checked_at": checked_at, "state": state}
+            state = dict(state)
+            state["cached"] = False
+
+        state["path"] = repo
+        state["name"] = os.path.relpath(repo, self.root)
+        state["ms"] = (time.perf_counter() - start) * 1000
+        return state
+
+    def scan(self):
+        """Returns one state dict per repo, checked in parallel."""
+        repos = self.discover()
+        if not repos:
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.check_repo, repos))
+
+        # Forget repos that were deleted or moved
+        known = set(repos)
+        self.cache = {k: v for k, v in self.cache.items() if k in known}
+        self._save_cache()
+        return results
+
 class Gustave:
     def _print_header(self):
         print("\n" + "="*60)
@@ -28,6 +316,7 @@ class Gustave:
         print(f"{Colors.BOLD}[ {name} ]{Colors.ENDC}")
 
     # --- TERMINAL REPORT METHODS ---
+    @telemetry.timed("gustave.vitals")
     def check_vitals(self):
         self.section("VITALS")
         total, used, free = shutil.disk_usage("/")
@@ -49,6 +338,7 @@ class Gustave:
             pass
         print("")
 
+    @telemetry.timed("gustave.services")
     def check_services(self):
         self.section("FACTORY FLOOR")
         try:
@@ -74,30 +364,44 @@ class Gustave:
             print(f"  ✨ Localhost:     {Colors.GREEN}All Clear{Colors.ENDC}")
         print("")
 
+    @telemetry.timed("gustave.projects")
     def check_git(self):
         self.section("PROJECTS")
         if not os.path.exists(PROJECTS_DIR): 
             print("  📂 Projects dir not found.")
             return
 
-        clean_count = 0
-        dirty_repos = []
+        start = time.perf_counter()
+        results = RepoScanner().scan()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        ok = [r for r in results if "error" not in r]
+        clean_count = sum(1 for r in ok if not r["dirty"])
+        dirty_repos = [r["name"] for r in ok if r["dirty"]]
+        ahead = [f"{r['name']} (+{r['ahead']})" for r in ok if r["ahead"]]
+        behind = [f"{r['name']} (-{r['behind']})" for r in ok if r["behind"]]
+        broken = [r["name"] for r in results if "error" in r]
 
-        for item in os.listdir(PROJECTS_DIR):
-            repo_path = os.path.join(PROJECTS_DIR, item)
-            if os.path.isdir(repo_path) and os.path.exists(os.path.join(repo_path, ".git")):
-                res = subprocess.run(["git", "status", "--porcelain"], cwd=repo_path, capture_output=True, text=True)
-                if res.stdout.strip():
-                    dirty_repos.append(item)
-                else:
-                    clean_count += 1
-        
         print(f"  ✅ Clean Repos:   {Colors.GREEN}{clean_count}{Colors.ENDC}")
-        
+
         if dirty_repos:
             print(f"  ⚠️  Uncommitted:   {Colors.RED}{', '.join(dirty_repos)}{Colors.ENDC}")
         else:
             print(f"  ✨ All Clear:     {Colors.GREEN}Ready to code.{Colors.ENDC}")
+        if ahead:
+            print(f"  ⬆️  Unpushed:      {Colors.YELLOW}{', '.join(ahead)}{Colors.ENDC}")
+        if behind:
+            print(f"  ⬇️  Behind:        {Colors.YELLOW}{', '.join(behind)}{Colors.ENDC}")
+        if broken:
+            print(f"  ❌ Unreadable:    {Colors.RED}{', '.join(broken)}{Colors.ENDC}")
+
+        # Timing: total, cache hits, and the slowest offenders
+        cached = sum(1 for r in results if r.get("cached"))
+        print(f"  ⏱️  Scanned {len(results)} repos in {elapsed_ms:.0f} ms ({cached} cached)")
+        slowest = sorted(results, key=lambda r: r["ms"], reverse=True)[:3]
+        for r in slowest:
+            if not r.get("cached"):
+                print(f"      {r['name']}: {r['ms']:.0f} ms")
         print("")
 
     def report(self):
@@ -126,14 +430,9 @@ class Gustave:
 
                 dirty_count = 0
                 if os.path.exists(PROJECTS_DIR):
-                    for item in os.listdir(PROJECTS_DIR):
-                        repo = os.path.join(PROJECTS_DIR, item)
-                        if os.path.isdir(repo) and os.path.exists(os.path.join(repo, ".git")):
-                            try:
-                                res = subprocess.run(["git", "status", "--porcelain"], cwd=repo, capture_output=True, text=True)
-                                if res.stdout.strip(): 
-                                    dirty_count += 1
-                            except: pass
+                    try:
+                        dirty_count = sum(1 for r in RepoScanner().scan() if r.get("dirty"))
+                    except: pass
 
                 # 2. Build Message (Simple text only)
                 status_word = "Healthy"
@@ -3,6 +3,7 @@ import shutil
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+import telemetry
 
 # --- CONFIGURATION ---
 SOURCE_DIR = os.path.expanduser("~/Downloads")
@@ -18,11 +19,20 @@ DESTINATIONS = {
     "Code": [".py", ".js", ".html", ".css", ".java", ".cpp", ".c", ".sql", ".sh", ".json", ".ipynb"]
 }
 
+# Seconds to let a fresh download finish writing before it is moved
+SETTLE_DELAY = 0.5
+# catch_up() leaves files modified more recently than this for the next round
+CATCH_UP_MIN_AGE = 10
+
 EMOJI_MAP = {
     "Images": "🖼️", "Documents": "📝", "Audio": "🎵", "Video": "🎥",
     "Archives": "📦", "Installers": "💿", "Code": "💻", "Others": "📂"
 }
 
+# --- TELEMETRY ---
+FILES_MOVED = telemetry.counter("gbh_serge_files_moved_total", "Files Serge sorted, by category")
+MOVE_ERRORS = telemetry.counter("gbh_serge_move_errors_total", "Files Serge failed to move")
+
 # --- LOGIC ---
 def send_notification(title, message):
     try:
@@ -49,7 +59,9 @@ class SmartSorter(FileSystemEventHandler):
 
     def process(self, event, is_move=False):
         file_path = event.dest_path if is_move else event.src_path
-        
+        self.sort_file(file_path, settle=SETTLE_DELAY)
+
+    def sort_file(self, file_path, settle=0):
         if not os.path.exists(file_path):
             return
 
@@ -82,19 +94,41 @@ class SmartSorter(FileSystemEventHandler):
         if os.path.dirname(file_path) == dest_dir: return
 
         try:
-            time.sleep(0.5)
+            if settle:
+                time.sleep(settle)
             dest_path = os.path.join(dest_dir, filename)
             final_dest = make_unique(dest_path)
-            shutil.move(file_path, final_dest)
+            with telemetry.span("serge.move"):
+                shutil.move(file_path, final_dest)
+            FILES_MOVED.inc(category=category)
             
             icon = EMOJI_MAP.get(category, "📂")
             send_notification(f"Moved to {category} {icon}", filename)
             print(f"✅ Moved {filename} -> {category}")
         except Exception as e:
+            MOVE_ERRORS.inc()
             print(f"❌ Error moving {filename}: {e}")
 
+def catch_up():
+    """Sorts files that landed in SOURCE_DIR while nobody was watching."""
+    if not os.path.exists(SOURCE_DIR):
+        return
+    sorter = SmartSorter()
+    cutoff = time.time() - CATCH_UP_MIN_AGE
+    files = []
+    with os.scandir(SOURCE_DIR) as it:
+        for e in it:
+            try:
+                # Still being written under its final name? Leave it for next time
+                if e.is_file(follow_symlinks=False) and e.stat(follow_symlinks=False).st_mtime < cutoff:
+                    files.append(e.path)
+            except OSError:
+                continue
+    for path in files:
+        sorter.sort_file(path)
+
 # --- THIS IS THE MISSING FUNCTION ---
-def start_watch():
+def start_watch(stop_event=None):
     if not os.path.exists(PROJECTS_DIR):
         os.makedirs(PROJECTS_DIR)
 
@@ -107,8 +141,12 @@ def start_watch():
     print(f"🎩 Serge is watching {SOURCE_DIR}")
 
     try:
-        while True:
-            time.sleep(1)
+        if stop_event is None:
+            while True:
+                time.sleep(1)
+        else:
+            stop_event.wait()
     except KeyboardInterrupt:
-        observer.stop()
+        pass
+    observer.stop()
     observer.join()
\ No newline at end of file
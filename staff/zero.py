@@ -1,12 +1,261 @@
 import os
+import re
+import json
+import errno
 import shutil
+import fnmatch
 import hashlib
 import time
+import tempfile
+from array import array
+import telemetry
 
 # --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TRASH_DIR = os.path.expanduser("~/.Trash")
 DESKTOP_DIR = os.path.expanduser("~/Desktop")
 
+# Sweeping (override the rules with SWEEP_RULES in config.py)
+DEFAULT_SWEEP_RULES = [
+    {"name": "screenshots", "dir": DESKTOP_DIR, "glob": "*Screenshot*.png", "older_than_days": 1},
+]
+SWEEP_INDEX_FILE = os.path.join(BASE_DIR, "zero_sweep_index.json")
+SWEEP_PREVIEW_LINES = 20              # Files listed per sweep before "...and N more"
+
+# Duplicate hunting
+MIN_DUPE_SIZE = 10240                 # Ignore files smaller than 10KB
+DEFAULT_MAX_MEMORY = 256 * 1024 ** 2  # Memory budget for candidate bookkeeping
+SPILL_PARTITIONS = 256                # Temp files used once the budget is exceeded
+SIZE_COUNT_COST = 100                 # ~bytes per entry while counting one partition's sizes
+
+# --- TELEMETRY ---
+FILES_CRAWLED = telemetry.counter("gbh_zero_files_crawled_total", "Files stat'ed by Zero's crawls")
+BYTES_HASHED = telemetry.counter("gbh_zero_bytes_hashed_total", "Bytes read by Zero's duplicate hashing")
+FILES_TRASHED = telemetry.counter("gbh_zero_files_trashed_total", "Files Zero moved to the Trash")
+DIRS_SKIPPED = telemetry.counter("gbh_zero_sweep_dirs_skipped_total", "Sweep folders skipped as unchanged")
+
+def _partition(size):
+    """Spill partition for a byte size (hashed, so 4K-multiples don't all land together)."""
+    return (size * 0x9E3779B97F4A7C15 >> 32) % SPILL_PARTITIONS
+
+def parse_size(text):
+    """'512M' -> 536870912. Accepts K/M/G/T suffixes (powers of 1024)."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def _iter_files(directory):
+    """Yields (dirpath, name, size, dev, inode) for every non-hidden file, using scandir."""
+    stack = [directory]
+    while stack:
+        path = stack.pop()
+        found = []
+        # List + stat one folder at a time, so the crawl span excludes the caller's work
+        with telemetry.span("zero.crawl"):
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif not entry.name.startswith("."):
+                                st = entry.stat()
+                                found.append((path, entry.name, st.st_size, st.st_dev, st.st_ino))
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        FILES_CRAWLED.inc(len(found))
+        yield from found
+
+def _free_name(name, taken):
+    """'shot.png' -> 'shot 2.png', 'shot 3.png'... until it doesn't clash (like Finder)."""
+    if name not in taken:
+        return name
+    stem, ext = os.path.splitext(name)
+    n = 2
+    while f"{stem} {n}{ext}" in taken:
+        n += 1
+    return f"{stem} {n}{ext}"
+
+def _move_no_clobber(src, dest):
+    """Moves `src` to `dest`, raising FileExistsError rather than ever replacing `dest`."""
+    try:
+        os.link(src, dest, follow_symlinks=False)  # Fails atomically if dest exists
+    except FileExistsError:
+        raise
+    except OSError:
+        # Different disk, or no hard links there (exFAT...): check, then move
+        if os.path.lexists(dest):
+            raise FileExistsError(errno.EEXIST, "File exists", dest)
+        shutil.move(src, dest)
+        return
+    try:
+        os.unlink(src)
+    except OSError:
+        os.unlink(dest)
+        raise
+
+# --- SWEEP RULES ---
+class SweepRule:
+    """
+    One retention rule: files in `dir` matching `glob` (or `regex`), and the
+    policies that decide which of them go to the Trash. A file goes if any
+    policy picks it:
+        older_than_days  created more than N days ago
+        keep_newest      all but the N newest matches
+        max_total_mb     the oldest matches, until the rest fit in N MB
+    """
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec.get("name") or spec.get("glob") or spec.get("regex") or spec.get("dir")
+        self.dir = os.path.expanduser(spec["dir"])
+        if "glob" in spec:
+            self.match = re.compile(fnmatch.translate(spec["glob"])).match
+        elif "regex" in spec:
+            self.match = re.compile(spec["regex"]).search
+        else:
+            raise ValueError(f"Sweep rule '{self.name}' needs a 'glob' or a 'regex'.")
+        self.older_than_days = spec.get("older_than_days")
+        self.keep_newest = spec.get("keep_newest")
+        self.max_total_mb = spec.get("max_total_mb")
+        if self.older_than_days is None and self.keep_newest is None and self.max_total_mb is None:
+            raise ValueError(f"Sweep rule '{self.name}' needs older_than_days, keep_newest or max_total_mb.")
+
+    def select(self, matches, now):
+        """
+        matches: [(name, created, size)]. Returns ({name: reason}, next_due), where
+        next_due is when the next kept file crosses the age limit (None if never).
+        """
+        doomed = {}
+        newest_first = sorted(matches, key=lambda m: m[1], reverse=True)
+        if self.older_than_days is not None:
+            cutoff = now - self.older_than_days * 86400
+            for name, created, _ in matches:
+                if created < cutoff:
+                    doomed[name] = f"older than {self.older_than_days} day(s)"
+        if self.keep_newest is not None:
+            for name, _, _ in newest_first[self.keep_newest:]:
+                doomed.setdefault(name, f"beyond the newest {self.keep_newest}")
+        if self.max_total_mb is not None:
+            total = 0
+            for name, _, size in newest_first:
+                total += size
+                if total > self.max_total_mb * 1024 * 1024:
+                    doomed.setdefault(name, f"over {self.max_total_mb} MB")
+
+        next_due = None
+        if self.older_than_days is not None:
+            kept = [created for name, created, _ in matches if name not in doomed]
+            if kept:
+                next_due = min(kept) + self.older_than_days * 86400
+        return doomed, next_due
+
+def load_sweep_rules(specs=None, days_old=None):
+    """SWEEP_RULES from config.py (or the defaults). `days_old` overrides every age limit."""
+    if specs is None:
+        try:
+            import config
+            specs = getattr(config, "SWEEP_RULES", DEFAULT_SWEEP_RULES)
+        except ImportError:
+            specs = DEFAULT_SWEEP_RULES
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        if days_old is not None and spec.get("older_than_days") is not None:
+            spec["older_than_days"] = days_old
+        rules.append(SweepRule(spec))
+    return rules
+
+# Spill records are one per line, but file names may contain newlines
+_SPILL_ESCAPES = {"\\": "\\\\", "\n": "\\n", "\r": "\\r"}
+_SPILL_UNESCAPES = {"\\": "\\", "n": "\n", "r": "\r"}
+
+def _escape_path(path):
+    return "".join(_SPILL_ESCAPES.get(c, c) for c in path) if any(c in path for c in "\\\n\r") else path
+
+def _unescape_path(text):
+    return re.sub(r"\\(.)", lambda m: _SPILL_UNESCAPES[m.group(1)], text) if "\\" in text else text
+
+class CandidateStore:
+    """
+    Columnar storage for duplicate candidates: directory paths are interned
+    once, sizes/devices/inodes live in typed arrays, so a candidate costs its
+    file name plus ~28 bytes instead of a full path string in a list in a dict.
+    """
+    def __init__(self):
+        self.dirs = []
+        self._dir_ids = {}
+        self.dir_idx = array("I")
+        self.names = []
+        self.sizes = array("Q")
+        self.devs = array("Q")
+        self.inodes = array("Q")
+        self._name_bytes = 0
+        self._dir_bytes = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, dirpath, name, size, dev, inode):
+        idx = self._dir_ids.get(dirpath)
+        if idx is None:
+            idx = self._dir_ids[dirpath] = len(self.dirs)
+            self.dirs.append(dirpath)
+            self._dir_bytes += len(dirpath) + 120  # str object + dict/list slots
+        self.dir_idx.append(idx)
+        self.names.append(name)
+        self.sizes.append(size)
+        self.devs.append(dev)
+        self.inodes.append(inode)
+        self._name_bytes += 57 + len(name)  # str object + list slot
+
+    def nbytes(self):
+        """Rough memory footprint, used to enforce the budget."""
+        return self._name_bytes + len(self) * 28 + self._dir_bytes
+
+    def path(self, i):
+        return os.path.join(self.dirs[self.dir_idx[i]], self.names[i])
+
+    def groups(self):
+        """Yields (size, [paths]) for every size shared by 2+ distinct files (hard links collapse)."""
+        order = sorted(range(len(self)), key=self.sizes.__getitem__)
+        start = 0
+        while start < len(order):
+            size = self.sizes[order[start]]
+            end = start
+            while end < len(order) and self.sizes[order[end]] == size:
+                end += 1
+            seen, paths = set(), []
+            for i in order[start:end]:
+                key = (self.devs[i], self.inodes[i])
+                if key not in seen:
+                    seen.add(key)
+                    paths.append(self.path(i))
+            if len(paths) > 1:
+                yield size, paths
+            start = end
+
+    def spill(self, files):
+        """Appends every candidate to its size partition on disk, then empties the store."""
+        for i in range(len(self)):
+            size = self.sizes[i]
+            path = _escape_path(self.path(i))
+            files[_partition(size)].write(f"{size}\t{self.devs[i]}\t{self.inodes[i]}\t{path}\n")
+        self.__init__()
+
+    @classmethod
+    def load(cls, f):
+        store = cls()
+        f.seek(0)
+        for line in f:
+            size, dev, inode, path = line.rstrip("\n").split("\t", 3)
+            path = _unescape_path(path)
+            store.add(os.path.dirname(path), os.path.basename(path), int(size), int(dev), int(inode))
+        return store
+
 class Zero:
     def __init__(self):
         self.log_msgs = []
@@ -15,35 +264,157 @@ class Zero:
         print(f"🟣 {msg}")
 
     # --- JOB 1: SCREENSHOT SWEEPER ---
-    def clean_screenshots(self, days_old=1):
-        """Moves screenshots older than X days to Trash."""
-        self.log(f"Sweeping Desktop for screenshots older than {days_old} day(s)...")
-        
+    def clean_screenshots(self, days_old=None, dry_run=False, rules=None):
+        """
+        Applies the sweep rules (by default: Desktop screenshots older than a day).
+        `days_old` overrides every rule's age limit (0 = everything that matches).
+        Returns what was moved to the Trash (or, with dry_run, what would be).
+        """
+        rules = load_sweep_rules(rules, days_old)
+        folders = sorted({rule.dir for rule in rules})
+        verb = "Previewing" if dry_run else "Sweeping"
+        self.log(f"{verb} {len(rules)} rule(s) over {', '.join(folders)}...")
+
+        swept = self.sweep(rules, dry_run=dry_run)
+        shown = [item for item in swept if dry_run or item["trashed_as"]]
+        for item in shown[:SWEEP_PREVIEW_LINES]:
+            icon = "👀 Would trash" if dry_run else "🗑️  Moved to Trash"
+            print(f"   {icon}: {os.path.basename(item['path'])} ({item['rule']}: {item['reason']})")
+        if len(shown) > SWEEP_PREVIEW_LINES:
+            print(f"   ...and {len(shown) - SWEEP_PREVIEW_LINES} more")
+
+        size_mb = sum(item["size"] for item in shown) / (1024 * 1024)
+        if not shown:
+            self.log("Nothing to sweep. The folders are clean.")
+        elif dry_run:
+            self.log(f"Dry run: {len(shown)} file(s), {size_mb:.2f} MB would go to the Trash.")
+        else:
+            self.log(f"Finished. Moved {len(shown)} files ({size_mb:.2f} MB) to Trash.")
+        return swept
+
+    def sweep(self, rules, dry_run=False):
+        """
+        One scandir per folder, and only matching names are stat'ed. A folder is
+        skipped without being listed if its mtime hasn't changed since the last
+        sweep (no file added, removed or renamed), its rules are the same and no
+        kept file has reached its age limit yet. Returns
+        [{"path", "rule", "reason", "size", "trashed_as"}].
+        """
+        index = self._load_sweep_index()
         now = time.time()
-        cutoff = now - (days_old * 86400) # 86400 seconds in a day
-        count = 0
+        by_dir = {}
+        for rule in rules:
+            by_dir.setdefault(rule.dir, []).append(rule)
 
-        if not os.path.exists(DESKTOP_DIR):
-            self.log("Desktop directory not found.")
-            return
+        swept = []
+        for directory, dir_rules in by_dir.items():
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self.log(f"{directory} not found.")
+                continue
+            signature = json.dumps([rule.spec for rule in dir_rules], sort_keys=True)
+            seen = index.get(directory)
+            if (seen and seen["mtime_ns"] == dir_mtime and seen["rules"] == signature
+                    and (seen["next_due"] is None or now < seen["next_due"])):
+                DIRS_SKIPPED.inc()
+                continue
 
-        for filename in os.listdir(DESKTOP_DIR):
-            # Target standard Mac screenshots
-            if "Screenshot" in filename and filename.endswith(".png"):
-                file_path = os.path.join(DESKTOP_DIR, filename)
+            matches = {id(rule): [] for rule in dir_rules}
+            with telemetry.span("zero.sweep_scan"):
                 try:
-                    # Check creation time
-                    if os.path.getctime(file_path) < cutoff:
-                        shutil.move(file_path, TRASH_DIR)
-                        print(f"   🗑️  Moved to Trash: {filename}")
-                        count += 1
-                except Exception as e:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            hits = [rule for rule in dir_rules if rule.match(entry.name)]
+                            if not hits: continue
+                            try:
+                                if not entry.is_file(follow_symlinks=False): continue
+                                st = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            # Creation time where the OS has it (macOS), else last modification
+                            created = getattr(st, "st_birthtime", st.st_mtime)
+                            for rule in hits:
+                                matches[id(rule)].append((entry.name, created, st.st_size))
+                except OSError as e:
                     print(f"   ❌ Error: {e}")
+                    continue
 
-        if count == 0:
-            self.log("Desktop is clean.")
-        else:
-            self.log(f"Finished. Moved {count} files to Trash.")
+            doomed, next_due = {}, None
+            for rule in dir_rules:
+                picked, due = rule.select(matches[id(rule)], now)
+                sizes = {name: size for name, _, size in matches[id(rule)]}
+                for name, reason in picked.items():
+                    doomed.setdefault(name, {"path": os.path.join(directory, name), "rule": rule.name,
+                                             "reason": reason, "size": sizes[name], "trashed_as": None})
+                if due is not None:
+                    next_due = due if next_due is None else min(next_due, due)
+            swept.extend(doomed.values())
+
+            if dry_run:
+                continue
+            moved = self._trash([item["path"] for item in doomed.values()])
+            for item in doomed.values():
+                item["trashed_as"] = moved.get(item["path"])
+            if all(moved.values()):
+                # mtime from before the scan: our own moves make the next sweep look once more
+                index[directory] = {"mtime_ns": dir_mtime, "rules": signature, "next_due": next_due}
+            else:
+                index.pop(directory, None)  # Retry the failures next time
+
+        if not dry_run:
+            self._save_sweep_index(index)
+        return swept
+
+    def _trash(self, paths):
+        """
+        Moves files into the Trash as one batch: the Trash is listed once, clashing
+        names get ' 2', ' 3'... and nothing already there is ever overwritten.
+        Returns {path: path in the Trash, or None if it failed}.
+        """
+        moved = {}
+        if not paths:
+            return moved
+        os.makedirs(TRASH_DIR, exist_ok=True)
+        try:
+            taken = set(os.listdir(TRASH_DIR))
+        except OSError:
+            taken = set()
+
+        for path in paths:
+            try:
+                with telemetry.span("zero.move"):
+                    while True:
+                        name = _free_name(os.path.basename(path), taken)
+                        dest = os.path.join(TRASH_DIR, name)
+                        try:
+                            _move_no_clobber(path, dest)
+                            break
+                        except FileExistsError:
+                            taken.add(name)  # Listing failed, or another sweep got there first
+                taken.add(name)
+                FILES_TRASHED.inc()
+                moved[path] = dest
+            except OSError as e:
+                print(f"   ❌ Error: {e}")
+                moved[path] = None
+        return moved
+
+    def _load_sweep_index(self):
+        try:
+            with open(SWEEP_INDEX_FILE, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sweep_index(self, index):
+        try:
+            tmp = SWEEP_INDEX_FILE + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp, SWEEP_INDEX_FILE)
+        except OSError:
+            pass
 
     # --- JOB 2: DUPLICATE HUNTER (SMART HASHING) ---
     def _get_hash(self, filepath, full=False):
@@ -54,7 +425,7 @@ class Zero:
         """
         hasher = hashlib.md5()
         try:
-            with open(filepath, 'rb') as f:
+            with telemetry.span("zero.hash"), open(filepath, 'rb') as f:
                 if full:
                     # Read in chunks to save RAM
                     while chunk := f.read(8192):
@@ -63,41 +434,114 @@ class Zero:
                     # Read only first 1KB
                     chunk = f.read(1024)
                     hasher.update(chunk)
+                BYTES_HASHED.inc(f.tell())
             return hasher.hexdigest()
         except (OSError, PermissionError):
             return None
 
-    def find_duplicates(self, directory):
+    def _colliding_sizes(self, directory, budget, progress=None):
+        """
+        Pass 1: which byte sizes occur more than once, and how often?
+        Only the sizes are kept (8 bytes per file). Past the budget they are
+        spilled to partition files by size, and each partition is counted alone.
+        """
+        sizes = array("Q")
+        partitions = None
+        scanned = 0
+
+        def spill(values):
+            buckets = [array("Q") for _ in partitions]
+            for v in values:
+                buckets[_partition(v)].append(v)
+            for f, bucket in zip(partitions, buckets):
+                bucket.tofile(f)
+
+        def collisions(values):
+            counts = {}
+            for v in values:
+                counts[v] = counts.get(v, 0) + 1
+            return {v: c for v, c in counts.items() if c > 1}
+
+        for _, _, size, _, _ in _iter_files(directory):
+            if progress: progress.add(files_crawled=1)
+            if size < MIN_DUPE_SIZE: continue
+            sizes.append(size)
+            scanned += 1
+            if len(sizes) * SIZE_COUNT_COST > budget:
+                if partitions is None:
+                    partitions = [tempfile.TemporaryFile() for _ in range(SPILL_PARTITIONS)]
+                    self.log(f"Memory budget reached: spilling sizes to {SPILL_PARTITIONS} temp files...")
+                spill(sizes)
+                sizes = array("Q")
+
+        if partitions is None:
+            return scanned, collisions(sizes)
+
+        spill(sizes)
+        colliding = {}
+        for f in partitions:
+            f.seek(0)
+            part = array("Q")
+            part.frombytes(f.read())
+            f.close()
+            colliding.update(collisions(part))
+        return scanned, colliding
+
+    def _candidate_groups(self, directory, colliding, budget, progress=None):
+        """
+        Pass 2: collect only files whose size collides, in a CandidateStore.
+        Yields (size, [paths]) groups; spills to disk if the store outgrows the budget.
+        """
+        store = CandidateStore()
+        partitions = None
+
+        for dirpath, name, size, dev, inode in _iter_files(directory):
+            if progress: progress.check()
+            if size not in colliding: continue
+            store.add(dirpath, name, size, dev, inode)
+            if store.nbytes() > budget:
+                if partitions is None:
+                    partitions = [tempfile.TemporaryFile("w+", encoding="utf-8", errors="surrogateescape")
+                                  for _ in range(SPILL_PARTITIONS)]
+                    self.log(f"Memory budget reached: spilling candidates to {SPILL_PARTITIONS} temp files...")
+                store.spill(partitions)
+
+        if partitions is None:
+            yield from store.groups()
+            return
+
+        store.spill(partitions)
+        for f in partitions:
+            yield from CandidateStore.load(f).groups()
+            f.close()
+
+    def scan_duplicates(self, directory, max_memory=None, progress=None):
+        """
+        Returns a list of duplicate groups (lists of paths). No prompts, no moves.
+        `progress` (see jobs.Progress) receives files_crawled/bytes_hashed updates.
+        """
         self.log(f"Hunting for duplicates in: {directory}")
-        
+        budget = max_memory or DEFAULT_MAX_MEMORY
+
         # Phase 1: Filter by SIZE (Fastest)
         # We only look at files that have the EXACT same byte size.
-        files_by_size = {}
-        for root, _, files in os.walk(directory):
-            for filename in files:
-                if filename.startswith(".") or filename == ".DS_Store": continue
-                
-                path = os.path.join(root, filename)
-                try:
-                    size = os.path.getsize(path)
-                    if size < 10240: continue # Ignore files smaller than 10KB
-                    
-                    if size not in files_by_size: files_by_size[size] = []
-                    files_by_size[size].append(path)
-                except OSError: pass
-
-        # Only keep lists with >1 file
-        potential_dupes = {s: p for s, p in files_by_size.items() if len(p) > 1}
-        self.log(f"Phase 1 Complete: Found {len(potential_dupes)} groups with identical sizes.")
+        if progress: progress.start_phase("crawling")
+        scanned, colliding = self._colliding_sizes(directory, budget, progress)
+        self.log(f"Phase 1 Complete: Found {len(colliding)} groups with identical sizes ({scanned} files scanned).")
+        potential_dupes = self._candidate_groups(directory, colliding, budget, progress)
+        if progress:
+            to_hash = sum(size * count for size, count in colliding.items())
+            progress.start_phase("hashing", total=to_hash, key="bytes_hashed")
 
         # Phase 2: Filter by HASH (Accurate)
         duplicates = []
         
-        for size, paths in potential_dupes.items():
+        for size, paths in potential_dupes:
             hashes = {}
             for path in paths:
                 # Get FULL hash to be 100% sure
                 file_hash = self._get_hash(path, full=True)
+                if progress: progress.add(bytes_hashed=size)
                 if not file_hash: continue
                 
                 if file_hash not in hashes: hashes[file_hash] = []
@@ -108,6 +552,11 @@ class Zero:
                 if len(file_list) > 1:
                     duplicates.append(file_list)
 
+        return duplicates
+
+    def find_duplicates(self, directory, max_memory=None):
+        duplicates = self.scan_duplicates(directory, max_memory=max_memory)
+
         if not duplicates:
             self.log("No duplicates found. Your system is efficient.")
             return
@@ -131,13 +580,10 @@ class Zero:
                 idx = int(choice) - 1
                 if 0 <= idx < len(group):
                     # User picked one to keep. Trash the rest.
-                    for j, path_to_trash in enumerate(group):
-                        if j != idx:
-                            try:
-                                shutil.move(path_to_trash, TRASH_DIR)
-                                total_saved += size_mb
-                                print(f"   🗑️  Trashed: {os.path.basename(path_to_trash)}")
-                            except Exception as e:
-                                print(f"   ❌ Error: {e}")
+                    moved = self._trash([p for j, p in enumerate(group) if j != idx])
+                    for path_to_trash, dest in moved.items():
+                        if dest:
+                            total_saved += size_mb
+                            print(f"   🗑️  Trashed: {os.path.basename(path_to_trash)}")
         
         print(f"\n✨ Cleanup Complete. You reclaimed {total_saved:.2f} MB of space.")
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+The Hotel Ledger: counters, histograms and span timers for the staff.
+
+Disabled by default and nearly free when off: span() hands back a shared no-op
+context manager, and inc()/observe() return after a single flag check.
+Turn it on with GBH_METRICS=1, telemetry.enable(), or `gbh profile <command>`.
+server.py turns it on and exports everything at /metrics (Prometheus text format).
+
+    with telemetry.span("zero.hash"):
+        ...
+    FILES_MOVED.inc(category="Images")
+"""
+import os
+import time
+import threading
+
+ENABLED = os.environ.get("GBH_METRICS") == "1"
+
+# Histogram buckets for span durations (seconds)
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+# --- METRIC TYPES ---
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        with self.lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}  # label key -> [bucket counts..., sum, count, max]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(labels)
+        with self.lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = [0] * len(self.buckets) + [0.0, 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    s[i] += 1
+                    break
+            s[-3] += value
+            s[-2] += 1
+            s[-1] = max(s[-1], value)
+
+    def stats(self):
+        """{label key: (count, sum, max)}"""
+        with self.lock:
+            return {k: (s[-2], s[-3], s[-1]) for k, s in self.series.items()}
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for key, s in sorted(self.series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, s):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {s[-2]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {s[-3]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {s[-2]}")
+        return lines
+
+
+def _register(metric):
+    with _lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name, help=""):
+    return _register(Counter(name, help))
+
+
+def histogram(name, help="", buckets=BUCKETS):
+    return _register(Histogram(name, help, buckets))
+
+
+# --- SPANS ---
+SPANS = histogram("gbh_span_seconds", "Time spent in each instrumented step")
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        SPANS.observe(time.perf_counter() - self.start, span=self.name)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    """Times a block: `with span("agatha.compress"): ...`"""
+    return _Span(name) if ENABLED else _NOOP
+
+
+def timed(name):
+    """Decorator version of span()."""
+    def wrap(func):
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        inner.__name__ = func.__name__
+        inner.__doc__ = func.__doc__
+        return inner
+    return wrap
+
+
+# --- EXPORT ---
+def render_prometheus():
+    lines = []
+    with _lock:
+        metrics = list(_registry.values())
+    for m in metrics:
+        body = m.render()
+        if not body:
+            continue
+        if m.help:
+            lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(body)
+    return "\n".join(lines) + "\n"
+
+
+def profile_report(wall_seconds):
+    """A per-phase breakdown of every span, plus non-zero counters, as printable lines."""
+    lines = [f"⏱️  Total wall time: {wall_seconds * 1000:.1f} ms", ""]
+    spans = sorted(SPANS.stats().items(), key=lambda kv: kv[1][1], reverse=True)
+    if spans:
+        lines.append(f"  {'phase':<24} {'calls':>8} {'total ms':>10} {'avg ms':>9} {'max ms':>9} {'% wall':>7}")
+        for key, (count, total, peak) in spans:
+            name = dict(key)["span"]
+            share = total / wall_seconds * 100 if wall_seconds else 0
+            lines.append(f"  {name:<24} {count:>8} {total * 1000:>10.1f} {total / count * 1000:>9.2f} "
+                         f"{peak * 1000:>9.2f} {share:>6.1f}%")
+    else:
+        lines.append("  (no instrumented phases ran)")
+
+    with _lock:
+        counters = [m for m in _registry.values() if isinstance(m, Counter)]
+    rows = []
+    for c in counters:
+        with c.lock:
+            for key, value in sorted(c.values.items()):
+                rows.append(f"  {c.name}{_format_labels(key)} = {value}")
+    if rows:
+        lines.append("")
+        lines.extend(rows)
+    return lines
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The suite lives next to main.py and the staff, which aren't an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+"""
+Cold-start guard (bench/startup.py) as a test: every `gbh` subcommand must stay
+within the import budget and only load the heavy packages it is allowed to.
+"""
+import pytest
+
+import main
+from bench import startup
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    return set(startup.import_profile("pass"))
+
+
+@pytest.mark.parametrize("command", sorted(main.COMMANDS))
+def test_cold_start(command, baseline):
+    ms, heavy, problems = startup.check(command, baseline)
+    assert not problems, "\n".join(problems)
+
+
+def test_heavy_allowed_names_real_commands():
+    """A renamed command would silently lose (or keep) its exemption."""
+    assert set(startup.HEAVY_ALLOWED) <= set(main.COMMANDS)
+    for command, packages in startup.HEAVY_ALLOWED.items():
+        assert packages <= startup.HEAVY, command